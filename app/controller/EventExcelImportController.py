@@ -79,42 +79,44 @@ class EventExcelImportController:
             imported = 0
             ignored = 0
 
-            for index, row in df.iterrows():
-                try:
-                    event_id = str(row["id"]).strip()
-
-                    # 🔁 Ignorer si l'événement existe déjà
-                    if event_manager.get_event(event_id):
-                        log_info(f"Événement déjà existant ignoré : {event_id}")
+            # Import groupé : prix et journal validés une seule fois à la fin
+            with event_manager.batch():
+                for index, row in df.iterrows():
+                    try:
+                        event_id = str(row["id"]).strip()
+
+                        # 🔁 Ignorer si l'événement existe déjà
+                        if event_manager.get_event(event_id):
+                            log_info(f"Événement déjà existant ignoré : {event_id}")
+                            ignored += 1
+                            continue
+
+                        ventes_raw = str(row.get("ventes_activees", "")).lower()
+                        ventes_activees = ventes_raw in ("true", "1", "yes", "oui")
+
+                        event_data = {
+                            "id": event_id,
+                            "nom": str(row["nom"]).strip(),
+                            "date": str(row["date"]).strip(),
+                            "categorie": str(row["categorie"]).strip(),
+                            "cout_total": float(row["cout_total"]),
+                            "ventes_activees": ventes_activees,
+                            "participants": {},
+                            "total_ventes": 0.0,
+                            "description": str(row.get("description", "")).strip()
+                        }
+
+                        # Création de l'événement
+                        event_manager.create_event(event_data)
+
+                        # Assignation optionnelle des participants
+                        self._assign_participants(row, event_id, students)
+
+                        imported += 1
+
+                    except Exception as e:
+                        log_error(f"Ligne {index + 2} ignorée : {e}")
                         ignored += 1
-                        continue
-
-                    ventes_raw = str(row.get("ventes_activees", "")).lower()
-                    ventes_activees = ventes_raw in ("true", "1", "yes", "oui")
-
-                    event_data = {
-                        "id": event_id,
-                        "nom": str(row["nom"]).strip(),
-                        "date": str(row["date"]).strip(),
-                        "categorie": str(row["categorie"]).strip(),
-                        "cout_total": float(row["cout_total"]),
-                        "ventes_activees": ventes_activees,
-                        "participants": {},
-                        "total_ventes": 0.0,
-                        "description": str(row.get("description", "")).strip()
-                    }
-
-                    # Création de l'événement
-                    event_manager.create_event(event_data)
-
-                    # Assignation optionnelle des participants
-                    self._assign_participants(row, event_id, students)
-
-                    imported += 1
-
-                except Exception as e:
-                    log_error(f"Ligne {index + 2} ignorée : {e}")
-                    ignored += 1
 
             messagebox.showinfo(
                 "Import terminé",
@@ -150,17 +152,19 @@ class EventExcelImportController:
         # 2️⃣ classe
         if "classe" in row and not pd.isna(row["classe"]):
             classe = str(row["classe"]).strip()
-            for s in students:
-                if s.get("classe") == classe:
-                    event_manager.assign_student_to_event(s["id"], event_id)
+            event_manager.assign_students_to_event(
+                [s["id"] for s in students if s.get("classe") == classe],
+                event_id
+            )
             return
 
         # 3️⃣ année
         if "annee" in row and not pd.isna(row["annee"]):
             annee = str(row["annee"]).strip()
-            for s in students:
-                if s.get("annee") == annee:
-                    event_manager.assign_student_to_event(s["id"], event_id)
+            event_manager.assign_students_to_event(
+                [s["id"] for s in students if s.get("annee") == annee],
+                event_id
+            )
 
         # Sinon : aucun participant
         return
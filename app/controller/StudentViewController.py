@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import messagebox
-from datetime import datetime
 
 from data.StudentDataManager import StudentDataManager
 from data.event_data_manager import event_manager
@@ -9,7 +8,9 @@ from popups.AssignEventPopup import AssignEventPopup
 from popups.CostCalculatorPopup import CostCalculatorPopup
 from controller.ExcelImportController import ExcelImportController
 
-from utils.date_utils import parse_event_date
+from services.student_filter_service import StudentFilterService
+from utils.settings_manager import SettingsManager
+from utils.logger import log_error
 
 
 class StudentViewController:
@@ -26,13 +27,15 @@ class StudentViewController:
 
         self.student_manager = StudentDataManager()
         self.event_manager = event_manager  # OK pour les filtres/assign
+        self.filter_service = StudentFilterService(self.student_manager, self.event_manager)
 
         root = self.view.frame.winfo_toplevel()
         self.excel_controller = ExcelImportController(root)
 
         self.students_data = []
         self.filtered_students = []
-        self.selected_students = []  # IDs int
+        self.selected_students = set()  # IDs int
+        self._selection_anchor = None   # dernier élève cliqué (sélection Maj+clic)
 
         self._using_excel_data = False
 
@@ -45,12 +48,30 @@ class StudentViewController:
     def load_all_students_on_startup(self):
         try:
             self.students_data = self.student_manager.get_all_students()
+            if self._vacuum_deleted_students():
+                self.students_data = self.student_manager.get_all_students()
             self.filtered_students = self.students_data.copy()
-            self.selected_students = []
+            self.selected_students = set()
+            self._selection_anchor = None
             self._refresh_view()
         except Exception as e:
             print(f"Erreur chargement initial: {e}")
 
+    def _vacuum_deleted_students(self):
+        """
+        Purge des élèves supprimés depuis longtemps et de leurs affectations.
+        Nettoyage facultatif : un échec est journalisé sans bloquer le chargement.
+        Retourne True si des élèves ont été purgés.
+        """
+        try:
+            retention_days = int(SettingsManager().get_tombstone_retention_days())
+            purged_ids = self.student_manager.vacuum(retention_days)
+            self.event_manager.purge_students(purged_ids)
+            return bool(purged_ids)
+        except Exception as e:
+            log_error(e, "Purge des élèves supprimés impossible")
+            return False
+
     def refresh_data(self):
         self.students_data = self.student_manager.get_all_students()
         self.apply_all_filters()
@@ -66,19 +87,11 @@ class StudentViewController:
     # =========================================================
 
     def get_available_years(self):
-        years = {
-            str(s.get("annee"))
-            for s in self.students_data
-            if s.get("annee") is not None
-        }
-        return sorted(years, key=lambda x: int(x) if str(x).isdigit() else 999)
+        # Compteurs maintenus par StudentDataManager (pas de parcours des élèves)
+        return [str(year) for year in self.student_manager.get_filter_options()['annees']]
 
     def get_available_classes(self):
-        return sorted({
-            str(s.get("classe"))
-            for s in self.students_data
-            if s.get("classe")
-        })
+        return self.student_manager.get_filter_options()['classes']
 
     def get_event_categories(self):
         return sorted({
@@ -102,14 +115,8 @@ class StudentViewController:
         })
 
     def get_available_months(self):
-        months = set()
-        for student in self.students_data:
-            for eid in self.event_manager.get_student_events(student["id"]):
-                event = self.event_manager.get_event(eid)
-                d = parse_event_date(event.get("date")) if event else None
-                if d:
-                    months.add(d.strftime("%B %Y"))
-        return sorted(months)
+        """Clés mois YYYYMM (ordre chronologique) ayant des participants"""
+        return self.event_manager.get_indexed_months()
 
     # =========================================================
     # IMPORT EXCEL
@@ -122,8 +129,7 @@ class StudentViewController:
                 return
 
             self._using_excel_data = True
-            self.student_manager.students = students
-            self.student_manager.save_data()
+            self.student_manager.replace_all(students)
 
             self.students_data = self.student_manager.get_all_students()
             self._using_excel_data = False
@@ -143,107 +149,18 @@ class StudentViewController:
     # =========================================================
 
     def apply_all_filters(self):
-        data = self.students_data
+        # Plan unique : filtres indexés, recherche, tri (voir StudentFilterService)
         filters = self.view.get_filters()
-
-        data = self._filter_by_year(data, filters)
-        data = self._filter_by_class(data, filters)
-        data = self._filter_by_event_category(data, filters)
-        data = self._filter_by_event(data, filters)
-        data = self._filter_by_month(data, filters)
-        data = self._filter_by_search(data, filters)
-
-        self.filtered_students = self._sort_students(data, filters["sort"])
+        self.filtered_students = self.filter_service.filter_students(self.students_data, filters)
         self._refresh_view()
 
-    def _filter_by_year(self, students, filters):
-        if filters["year"] == "Toutes":
-            return students
-        year = filters["year"].replace("ère", "").replace("ème", "").replace("e", "")
-        return [s for s in students if str(s.get("annee")) == year]
-
-    def _filter_by_class(self, students, filters):
-        if filters["class"] == "Toutes":
-            return students
-        return [s for s in students if s.get("classe") == filters["class"]]
-
-    def _filter_by_event_category(self, students, filters):
-        category = filters.get("event_category")
-        if not category or category == "Toutes":
-            return students
-
-        result = []
-        for student in students:
-            for eid in self.event_manager.get_student_events(student["id"]):
-                event = self.event_manager.get_event(eid)
-                if event and event.get("categorie") == category:
-                    result.append(student)
-                    break
-        return result
-
-    def _filter_by_event(self, students, filters):
-        if filters["event"] == "Tous":
-            return students
-        return [
-            s for s in students
-            if filters["event"] in self.get_student_events_names_only(s)
-        ]
-
-    def _filter_by_month(self, students, filters):
-        if filters["month"] == "Tous":
-            return students
-
-        result = []
-        for student in students:
-            for eid in self.event_manager.get_student_events(student["id"]):
-                event = self.event_manager.get_event(eid)
-                d = parse_event_date(event.get("date")) if event else None
-                if d and d.strftime("%B %Y") == filters["month"]:
-                    result.append(student)
-                    break
-        return result
-
-    def _filter_by_search(self, students, filters):
-        search = (filters.get("search") or "").lower().strip()
-        if not search:
-            return students
-
-        return [
-            s for s in students
-            if search in s.get("nom", "").lower()
-            or search in s.get("prenom", "").lower()
-        ]
-
-    # =========================================================
-    # TRI
-    # =========================================================
-
-    def _sort_students(self, students, sort_type):
-        if sort_type == "Nom A-Z":
-            return sorted(students, key=lambda x: x.get("nom", "").lower())
-
-        if sort_type == "Nom Z-A":
-            return sorted(students, key=lambda x: x.get("nom", "").lower(), reverse=True)
+    def get_filter_timings(self):
+        """Durées par étape du dernier filtrage (profilage)"""
+        return self.filter_service.last_timings
 
-        if sort_type == "Classe":
-            return sorted(students, key=lambda x: (int(x.get("annee", 0)), x.get("classe", "")))
-
-        if sort_type == "Année":
-            return sorted(students, key=lambda x: int(x.get("annee", 0)))
-
-        if sort_type == "Date (Mois)":
-            def next_event_date(student):
-                dates = []
-                for eid in self.event_manager.get_student_events(student["id"]):
-                    event = self.event_manager.get_event(eid)
-                    d = parse_event_date(event.get("date")) if event else None
-                    if d:
-                        dates.append(d)
-                return min(dates) if dates else datetime.max
-
-            return sorted(students, key=next_event_date)
-
-        return students
+    def get_filter_cache_stats(self):
+        """Succès / échecs du cache des résultats de filtrage (diagnostic)"""
+        return self.filter_service.cache_stats()
 
     # =========================================================
     # ÉVÉNEMENTS ÉLÈVES
@@ -255,9 +172,9 @@ class StudentViewController:
             event = self.event_manager.get_event(eid)
             if event:
                 name = event.get("nom", "")
-                d = parse_event_date(event.get("date"))
+                d = event.date_value
                 if d:
-                    name += f" ({d.strftime('%d/%m')})"
+                    name += f" ({d.day:02d}/{d.month:02d})"
                 events_info.append(name)
         return events_info
 
@@ -313,18 +230,50 @@ class StudentViewController:
     # MÉTHODES APPELÉES PAR LA VUE
     # =========================================================
 
-    def toggle_student_selection(self, student_id: int):
+    def toggle_student_selection(self, student_id: int, extend: bool = False):
+        """Coche / décoche un élève ; extend (Maj+clic) sélectionne depuis le dernier clic"""
         try:
             sid = int(student_id)
         except ValueError:
             return
 
+        if extend and self._selection_anchor is not None:
+            if self.select_range(self._selection_anchor, sid):
+                return
+
         if sid in self.selected_students:
-            self.selected_students.remove(sid)
+            self.selected_students.discard(sid)
         else:
-            self.selected_students.append(sid)
+            self.selected_students.add(sid)
+        self._selection_anchor = sid
 
-        self._refresh_view()
+        self._refresh_selection({sid})
+
+    def select_range(self, from_id: int, to_id: int):
+        """Sélectionne les élèves affichés entre from_id et to_id (inclus)"""
+        ids = [student["id"] for student in self.filtered_students]
+        try:
+            start, end = sorted((ids.index(from_id), ids.index(to_id)))
+        except ValueError:
+            return False
+
+        changed = set(ids[start:end + 1]) - self.selected_students
+        self.selected_students |= changed
+        self._selection_anchor = to_id
+        self._refresh_selection(changed)
+        return True
+
+    def select_all_filtered(self):
+        """Sélectionne tous les élèves affichés"""
+        changed = {student["id"] for student in self.filtered_students} - self.selected_students
+        self.selected_students |= changed
+        self._refresh_selection(changed)
+
+    def clear_selection(self):
+        changed = set(self.selected_students)
+        self.selected_students.clear()
+        self._selection_anchor = None
+        self._refresh_selection(changed)
 
     def open_student_details(self, student_id: int):
         try:
@@ -332,7 +281,7 @@ class StudentViewController:
         except ValueError:
             return
 
-        student = next((s for s in self.students_data if int(s.get("id", -1)) == sid), None)
+        student = self.student_manager.get_student_by_id(sid)
         if not student:
             messagebox.showwarning("Élève", "Élève introuvable.")
             return
@@ -401,3 +350,12 @@ class StudentViewController:
     def _refresh_view(self):
         if hasattr(self.view, "update_display"):
             self.view.update_display()
+
+    def _refresh_selection(self, changed_ids):
+        """Seule la sélection a changé : pas de nouveau rendu du tableau"""
+        if not changed_ids:
+            return
+        if hasattr(self.view, "update_selection"):
+            self.view.update_selection(changed_ids)
+        else:
+            self._refresh_view()
@@ -1,99 +1,301 @@
 import json
 import os
+import threading
+from datetime import datetime, timedelta
 
 from utils.data_path_resolver import DataPathResolver
+from utils.settings_manager import SettingsManager
+from data.student_storage import create_student_storage
+from data.background_writer import background_writer, atomic_write
+from services.student_search_index import StudentSearchIndex
+from services.student_fuzzy_index import StudentFuzzyIndex
+from model.student import Student
+from model.categories import CLASSES, YEARS, OPTIONS
+from utils.logger import log_error
+
+# Colonnes dont on compte les valeurs (options des filtres) : nom -> (table, attribut code)
+_COUNTED_COLUMNS = {
+    'classes': (CLASSES, 'classe_code'),
+    'annees': (YEARS, 'annee_code'),
+    'options': (OPTIONS, 'option_code'),
+}
 
 class StudentDataManager:
-    def __init__(self):
+    def __init__(self, storage=None):
         resolver = DataPathResolver()
         self.data_file = resolver.get_file("students_data.json")
+        self.archive_file = resolver.get_file("students_archive.json")
+        # Protège self.students entre le thread Tk et le thread d'écriture
+        self.lock = threading.RLock()
+        self.writer = background_writer
+        # Moteur de stockage (JSON par défaut, SQLite via les paramètres)
+        settings = SettingsManager()
+        self.storage = storage or create_student_storage(
+            resolver,
+            settings.get_student_storage(),
+            writer=self.writer,
+            lock=self.lock,
+            use_cache=settings.is_snapshot_cache_enabled()
+        )
         self.students = []
+        self._by_id = {}   # index id -> fiche (fiches supprimées comprises)
+        self._active = {}  # fiches non supprimées (ensemble ordonné : fiche -> None)
+        self._active_list = None  # cache de get_all_students()
+        self._counts = {name: {} for name in _COUNTED_COLUMNS}  # code -> nb de fiches actives
+        # Recherche texte / approchée sur les fiches actives (construites à la première recherche)
+        self.search_index = StudentSearchIndex(self.get_all_students)
+        self.fuzzy_index = StudentFuzzyIndex(self.get_all_students)
+        self._text_indexes = (self.search_index, self.fuzzy_index)
+        self.next_id = 1   # prochain ID attribué (jamais réutilisé)
+        self.version = 0   # incrémenté à chaque modification (caches des vues)
         self.load_data()
         
     def load_data(self):
-        """Charge les données depuis le fichier JSON"""
+        """Charge les données depuis le moteur de stockage"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.students = data.get('students', [])
-                    print(f"Données chargées: {len(self.students)} étudiants")
+            students = self.storage.load_all()
+            if students is not None:
+                # Conversion unique dict JSON -> Student typé
+                self.students = [Student.from_dict(s) for s in students]
+                print(f"Données chargées: {len(self.students)} étudiants")
             else:
                 self.students = []
                 print("Fichier de données non trouvé, liste vide créée")
         except Exception as e:
             print(f"Erreur lors du chargement des données: {e}")
             self.students = []
+        self._rebuild_index(self.storage.next_id)
+
+    def _rebuild_index(self, stored_next_id=None):
+        """Reconstruit les index (ID, fiches actives, compteurs) et resynchronise le compteur d'ID"""
+        self.version += 1
+        self._by_id = {s.id: s for s in self.students if s.id is not None}
+        max_id = max(self._by_id) if self._by_id else 0
+        self.next_id = max(stored_next_id or 1, self.next_id, max_id + 1)
+
+        self._active = {}
+        self._active_list = None
+        self._counts = {name: {} for name in _COUNTED_COLUMNS}
+        for index in self._text_indexes:
+            index.clear()
+        for student in self.students:
+            self._index_active(student)
+
+    def _index_active(self, student):
+        """Ajoute une fiche active à la vue et aux compteurs de valeurs"""
+        if student.deleted or student in self._active:
+            return
+        self._active[student] = None
+        self._active_list = None
+        self._count_values(student, 1)
+        for index in self._text_indexes:
+            index.add(student)
+
+    def _unindex_active(self, student):
+        """Retire une fiche de la vue active (suppression)"""
+        if student not in self._active:
+            return
+        del self._active[student]
+        self._active_list = None
+        self._count_values(student, -1)
+        for index in self._text_indexes:
+            index.remove(student)
+
+    def _count_values(self, student, delta):
+        for name, (_, code_attr) in _COUNTED_COLUMNS.items():
+            code = getattr(student, code_attr)
+            if code is None:
+                continue
+            counts = self._counts[name]
+            count = counts.get(code, 0) + delta
+            if count > 0:
+                counts[code] = count
+            else:
+                counts.pop(code, None)
+
+    def _allocate_id(self):
+        student_id = self.next_id
+        self.next_id += 1
+        return student_id
             
     def save_data(self):
-        """Sauvegarde les données dans le fichier JSON"""
+        """
+        Sauvegarde toutes les données (réécriture complète du stockage).
+        Avec le stockage JSON, l'écriture est seulement programmée en arrière-plan
+        (voir flush()) : True signifie alors "programmée", pas "écrite".
+        """
+        count = len(self.students)
         try:
-            # Créer le dossier si nécessaire
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            
-            data = {'students': self.students}
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"Données sauvegardées: {len(self.students)} étudiants")
+            self.storage.save_all(
+                self.students, self.next_id,
+                on_written=lambda: print(f"Données sauvegardées: {count} étudiants")
+            )
+            if self.storage.deferred_writes:
+                # Erreur d'écriture éventuelle : voir writer.pop_errors()
+                print(f"Sauvegarde programmée: {count} étudiants")
+            return True
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde: {e}")
+            return False
+
+    def flush(self):
+        """Attend la fin des écritures en attente (fermeture, tests)"""
+        return self.writer.flush()
+
+    def _save_student(self, student):
+        """Sauvegarde une seule fiche (une ligne si le moteur le permet)"""
+        if not self.storage.supports_row_writes:
+            return self.save_data()
+        try:
+            self.storage.save_student(student, self.next_id)
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde: {e}")
             return False
     
     def get_all_students(self):
-        """Retourne tous les étudiants non supprimés"""
-        return [s for s in self.students if not s.get('deleted', False)]
+        """
+        Retourne tous les étudiants non supprimés.
+        La liste est mise en cache jusqu'à la prochaine modification : ne pas la modifier.
+        """
+        if self._active_list is None:
+            self._active_list = list(self._active)
+        return self._active_list
     
     def get_student_by_id(self, student_id):
         """Récupère un étudiant par son ID"""
-        for student in self.students:
-            if student.get('id') == student_id and not student.get('deleted', False):
-                return student
+        student = self._by_id.get(student_id)
+        if student is not None and not student.deleted:
+            return student
         return None
     
     def update_student(self, student_id, updated_data):
         """Met à jour un étudiant"""
-        for student in self.students:
-            if student.get('id') == student_id:
-                student.update(updated_data)
-                return self.save_data()
-        return False
+        student = self._by_id.get(student_id)
+        if student is None:
+            return False
+        # L'ID est la clé de l'index : il ne change pas
+        updated_data = {k: v for k, v in updated_data.items() if k != 'id'}
+        with self.lock:
+            self.version += 1
+            was_active = student in self._active
+            if was_active:
+                self._count_values(student, -1)
+                for index in self._text_indexes:
+                    index.remove(student)
+            student.update(updated_data)
+            if was_active and not student.deleted:
+                self._count_values(student, 1)
+                for index in self._text_indexes:
+                    index.add(student)
+            elif was_active or not student.deleted:
+                # Suppression / restauration via update : on reconstruit dans l'ordre
+                self._rebuild_index()
+        return self._save_student(student)
     
     def delete_student(self, student_id):
         """Marque un étudiant comme supprimé"""
-        for student in self.students:
-            if student.get('id') == student_id:
-                student['deleted'] = True
-                return self.save_data()
-        return False
+        student = self._by_id.get(student_id)
+        if student is None:
+            return False
+        with self.lock:
+            self.version += 1
+            self._unindex_active(student)
+            student.deleted = True
+            student.deleted_at = datetime.now().isoformat(timespec="seconds")
+        return self._save_student(student)
     
+    def vacuum(self, retention_days):
+        """
+        Purge les élèves supprimés depuis plus de retention_days jours.
+        Les fiches purgées sont archivées (students_archive.json) puis le stockage
+        est réécrit une seule fois. Retourne les IDs purgés (références à nettoyer
+        dans les événements).
+        """
+        now = datetime.now()
+        limit = (now - timedelta(days=retention_days)).isoformat(timespec="seconds")
+
+        with self.lock:
+            kept, purged = [], []
+            stamped = False
+            for student in self.students:
+                if student.deleted and not student.deleted_at:
+                    # Suppression antérieure à la date de suppression : le délai part d'aujourd'hui
+                    student.deleted_at = now.isoformat(timespec="seconds")
+                    stamped = True
+                if student.deleted and student.deleted_at <= limit:
+                    purged.append(student)
+                else:
+                    kept.append(student)
+
+            if not purged:
+                if stamped:
+                    self.save_data()
+                return []
+
+            # Archive d'abord : une fiche n'est jamais perdue si la réécriture échoue
+            self._archive(purged)
+            self.students = kept
+            self._rebuild_index(self.next_id)
+
+        self.save_data()
+        print(f"Purge: {len(purged)} étudiants supprimés archivés")
+        return [s.id for s in purged if s.id is not None]
+
+    def _archive(self, students):
+        archived = []
+        if os.path.exists(self.archive_file):
+            try:
+                with open(self.archive_file, 'r', encoding='utf-8') as f:
+                    archived = json.load(f).get('students', [])
+            except (ValueError, AttributeError) as e:
+                # Archive illisible : mise de côté (jamais écrasée), nouvelle archive
+                corrupt_file = self.archive_file + ".corrupt"
+                os.replace(self.archive_file, corrupt_file)
+                log_error(e, f"Archive illisible déplacée vers {corrupt_file}")
+                archived = []
+        archived.extend(s.to_dict() for s in students)
+        atomic_write(
+            self.archive_file,
+            json.dumps({'students': archived}, ensure_ascii=False, indent=2)
+        )
+
+    def _new_student(self, student_data):
+        student = Student.from_dict(student_data)
+        student.id = self._allocate_id()
+        student.deleted = False
+        self.students.append(student)
+        self._by_id[student.id] = student
+        self._index_active(student)
+        self.version += 1
+        return student
+
     def add_student(self, student_data):
         """Ajoute un nouvel étudiant"""
-        # Générer un nouvel ID
-        max_id = max([s.get('id', 0) for s in self.students]) if self.students else 0
-        student_data['id'] = max_id + 1
-        student_data['deleted'] = False
-        
-        self.students.append(student_data)
+        with self.lock:
+            student = self._new_student(student_data)
+        return self._save_student(student)
+
+    def add_students(self, students_data):
+        """Ajoute plusieurs étudiants avec une seule sauvegarde"""
+        with self.lock:
+            for student_data in students_data:
+                self._new_student(student_data)
+        return self.save_data()
+
+    def replace_all(self, students):
+        """Remplace toute la liste (import Excel) et resynchronise l'index"""
+        with self.lock:
+            self.students = [Student.from_dict(s) for s in students]
+            self._rebuild_index()
         return self.save_data()
     
     def get_filter_options(self):
-        """Retourne les options disponibles pour les filtres"""
-        active_students = self.get_all_students()
-        classes = set()
-        annees = set()
-        options = set()
-        
-        for student in active_students:
-            if student.get('classe'):
-                classes.add(student['classe'])
-            if student.get('annee'):
-                annees.add(student['annee'])
-            if student.get('option'):
-                options.add(student['option'])
-                
+        """Retourne les options disponibles pour les filtres (valeurs des fiches actives)"""
         return {
-            'classes': sorted(list(classes)),
-            'annees': sorted(list(annees)),
-            'options': sorted(list(options))
-        }
\ No newline at end of file
+            name: sorted(
+                table.values[code] for code in self._counts[name]
+                if table.values[code] != ""
+            )
+            for name, (table, _) in _COUNTED_COLUMNS.items()
+        }
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from utils.logger import log_error
+
+
+def atomic_write(path, payload):
+    """Écrit dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    if isinstance(payload, bytes):
+        f = open(tmp_path, 'wb')
+    else:
+        f = open(tmp_path, 'w', encoding='utf-8')
+    with f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class BackgroundWriter:
+    """
+    Thread d'écriture différée partagé par les gestionnaires de données
+    - schedule() regroupe les demandes rapprochées : une seule écriture par fichier
+    - le contenu est construit dans le thread (build_payload) au moment d'écrire
+    - flush() attend la fin des écritures (fermeture de l'application)
+    - les erreurs sont conservées pour être affichées par l'interface (pop_errors)
+    """
+
+    def __init__(self, delay=0.3, max_delay=2.0):
+        self.delay = delay          # silence attendu avant d'écrire
+        self.max_delay = max_delay  # attente maximale sous un flux continu de demandes
+
+        self._cond = threading.Condition()
+        self._pending = {}  # chemin -> (build_payload, on_written)
+        self._first_request = None
+        self._last_request = None
+        self._flush_requested = False
+        self._busy = False
+        self._errors = []
+        self._thread = None
+
+    def schedule(self, path, build_payload, on_written=None):
+        """Demande l'écriture de path ; remplace une demande en attente sur le même fichier"""
+        with self._cond:
+            now = time.monotonic()
+            self._pending[path] = (build_payload, on_written)
+            if self._first_request is None:
+                self._first_request = now
+            self._last_request = now
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="BackgroundWriter", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Écrit immédiatement tout ce qui est en attente et attend la fin"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._pending and not self._busy:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def pop_errors(self):
+        """Retourne (et oublie) les erreurs d'écriture survenues : [(chemin, exception)]"""
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                # Attente d'un moment de calme (ou d'un flush)
+                while not self._flush_requested:
+                    deadline = min(
+                        self._last_request + self.delay,
+                        self._first_request + self.max_delay
+                    )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                jobs, self._pending = self._pending, {}
+                self._first_request = None
+                self._busy = True
+
+            for path, (build_payload, on_written) in jobs.items():
+                try:
+                    atomic_write(path, build_payload())
+                    if on_written:
+                        on_written()
+                except Exception as e:
+                    log_error(e, f"Écriture en arrière-plan impossible: {path}")
+                    with self._cond:
+                        self._errors.append((path, e))
+
+            with self._cond:
+                self._busy = False
+                if not self._pending:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+
+# Instance globale
+background_writer = BackgroundWriter()
@@ -1,54 +1,109 @@
-import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from utils.data_path_resolver import DataPathResolver
+from utils.settings_manager import SettingsManager
+from data.mutation_journal import MutationJournal
+from data.background_writer import background_writer
+from data.migrations import run_migrations, SCHEMA_VERSION_KEY, EVENTS_SCHEMA_VERSION
+from data.snapshot_cache import load_json, encode_snapshot, save_cache
+from model.event import Event, Participation
+from model.categories import EVENT_CATEGORIES
 
 class EventDataManager:
+    # Nombre d'opérations journalisées avant compactage dans le snapshot JSON
+    JOURNAL_COMPACT_THRESHOLD = 500
+
     def __init__(self):
         resolver = DataPathResolver()
         self.data_file = resolver.get_file("events_assignments.json")
+        self.journal = MutationJournal(resolver.get_file("events_assignments.journal"))
+        self.use_cache = SettingsManager().is_snapshot_cache_enabled()
+        self._snapshot = {}
+
+        # Protège events_data entre le thread Tk et le thread d'écriture
+        self.lock = threading.RLock()
+        self.writer = background_writer
+
+        # Unité de travail en cours (voir batch())
+        self._batch_depth = 0
+        self._pending_records = []
+        self._dirty_events = None
+
+        self._needs_save = False
+        self.version = 0  # incrémenté à chaque modification (caches des vues)
+        # Index inverse : ("nom"|"categorie"|"mois", valeur) -> {student_id: nb d'événements}
+        self._student_index = {}
         self.events_data = self.load_data()
+        if self._needs_save:
+            self.save_data()
+            self._needs_save = False
     
     def load_data(self):
-        """Charge les données depuis le fichier JSON"""
+        """Charge le snapshot JSON puis rejoue le journal des modifications"""
+        self.version += 1
+        self.events_data = self._load_snapshot()
+        self._rebuild_student_index()
+        self._replay_journal()
+        return self.events_data
+
+    def _load_snapshot(self):
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Migration des données existantes vers le nouveau format
-                    return self.migrate_data_format(data)
+                data = load_json(self.data_file, self.use_cache)
+                # Migration des données existantes vers le nouveau format
+                return self._from_json(self.migrate_data_format(data))
             except:
-                return self.get_default_data()
-        return self.get_default_data()
+                return self._from_json(self.get_default_data())
+        return self._from_json(self.get_default_data())
+
+    @staticmethod
+    def _from_json(data):
+        """Dicts JSON -> événements typés (une seule conversion au chargement)"""
+        data["events"] = {
+            event_id: Event.from_dict(event)
+            for event_id, event in data.get("events", {}).items()
+        }
+        data.setdefault("student_events", {})
+        return data
+
+    def _to_json(self):
+        """Événements typés -> dicts JSON (snapshot)"""
+        data = dict(self.events_data)
+        data["events"] = {
+            event_id: event.to_dict()
+            for event_id, event in self.events_data["events"].items()
+        }
+        return data
+
+    def _replay_journal(self):
+        records = self.journal.read_records()
+
+        # Les prix ne sont recalculés qu'une fois par événement touché
+        self._dirty_events = set()
+        for record in records:
+            try:
+                self._execute(record)
+            except Exception as e:
+                print(f"Journal: opération ignorée ({record.get('op')}): {e}")
+        self._recalculate_dirty_events()
+
+        if records:
+            print(f"Journal rejoué: {len(records)} opérations")
     
     def migrate_data_format(self, data):
-        """Migre les anciennes données vers le nouveau format avec ventes"""
-        if "events" in data:
-            for event_id, event in data["events"].items():
-                # Ajouter les nouveaux champs s'ils n'existent pas
-                if "ventes_activees" not in event:
-                    event["ventes_activees"] = False
-                if "total_ventes" not in event:
-                    event["total_ventes"] = 0.0
-                
-                # Migrer l'ancien format des participants si nécessaire
-                if "participants" in event:
-                    for student_id, participant_data in event["participants"].items():
-                        # Ancienne structure : {"vente": 0, "prix_final": 0}
-                        # Nouvelle structure : {"prix_base": 0, "prix_final": 0}
-                        if "vente" in participant_data and "prix_base" not in participant_data:
-                            # Supprimer l'ancien champ "vente" au niveau individuel
-                            participant_data.pop("vente", None)
-                        if "prix_base" not in participant_data:
-                            participant_data["prix_base"] = 0.0
-                        if "prix_final" not in participant_data:
-                            participant_data["prix_final"] = 0.0
-        
+        """Applique les migrations de format manquantes (voir data/migrations.py)"""
+        if run_migrations(data):
+            print(f"Données migrées vers le format v{data[SCHEMA_VERSION_KEY]}")
+            # Le fichier migré est réécrit une seule fois
+            self._needs_save = True
         return data
     
     def get_default_data(self):
         """Structure de données par défaut"""
         return {
+            SCHEMA_VERSION_KEY: EVENTS_SCHEMA_VERSION,
             "events": {
                 "sortie_theatre": {
                     "id": "sortie_theatre",
@@ -85,10 +140,36 @@ class EventDataManager:
         }
     
     def save_data(self):
-        """Sauvegarde les données dans le fichier JSON"""
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.events_data, f, ensure_ascii=False, indent=2)
+        """
+        Programme l'écriture du snapshot JSON complet (compactage du journal).
+        L'écriture a lieu en arrière-plan ; flush() pour l'attendre.
+        """
+        self.writer.schedule(self.data_file, self._build_snapshot, self._snapshot_written)
+
+    def _build_snapshot(self):
+        # Exécuté dans le thread d'écriture : capture cohérente données + journal
+        with self.lock:
+            payload, blob = encode_snapshot(self._to_json())
+            self.journal.rotate()
+        self._snapshot = {"payload": payload, "blob": blob}
+        return payload
+
+    def _snapshot_written(self):
+        self.journal.discard_rotated()
+        if self.use_cache:
+            save_cache(self.data_file, self._snapshot["payload"], self._snapshot["blob"])
+        self._snapshot = {}
+
+    def flush(self):
+        """Attend la fin des écritures en attente (fermeture, tests)"""
+        return self.writer.flush()
+
+    def close(self):
+        """À appeler à la fermeture : intègre le journal dans le snapshot"""
+        if self.journal.has_records():
+            self.save_data()
+        self.flush()
+        self.journal.close()
     
     def get_events(self):
         """Retourne la liste des événements"""
@@ -98,56 +179,213 @@ class EventDataManager:
         """Retourne un événement spécifique"""
         return self.events_data["events"].get(event_id)
     
+    # =========================================================
+    # MODIFICATIONS (journalisées)
+    # =========================================================
+
     def assign_student_to_event(self, student_id, event_id):
         """Assigne un élève à un événement"""
-        # Ajouter à la liste des événements de l'élève
-        if str(student_id) not in self.events_data["student_events"]:
-            self.events_data["student_events"][str(student_id)] = []
-        
-        if event_id not in self.events_data["student_events"][str(student_id)]:
-            self.events_data["student_events"][str(student_id)].append(event_id)
-        
-        # Ajouter aux participants de l'événement
-        if event_id in self.events_data["events"]:
-            self.events_data["events"][event_id]["participants"][str(student_id)] = {
-                "prix_base": 0.0,
-                "prix_final": 0.0
-            }
-        
-        self.calculate_event_prices(event_id)
-        self.save_data()
+        self._apply({"op": "assign", "student_id": str(student_id), "event_id": event_id})
     
     def remove_student_from_event(self, student_id, event_id):
         """Retire un élève d'un événement"""
-        # Retirer de la liste des événements de l'élève
-        if str(student_id) in self.events_data["student_events"]:
-            if event_id in self.events_data["student_events"][str(student_id)]:
-                self.events_data["student_events"][str(student_id)].remove(event_id)
-        
-        # Retirer des participants de l'événement
-        if event_id in self.events_data["events"]:
-            if str(student_id) in self.events_data["events"][event_id]["participants"]:
-                del self.events_data["events"][event_id]["participants"][str(student_id)]
-        
-        self.calculate_event_prices(event_id)
-        self.save_data()
+        self._apply({"op": "remove", "student_id": str(student_id), "event_id": event_id})
+
+    def assign_students_to_event(self, student_ids, event_id):
+        """Assigne plusieurs élèves à un événement (un seul calcul de prix)"""
+        student_ids = [str(sid) for sid in student_ids]
+        if student_ids:
+            self._apply({"op": "assign_many", "student_ids": student_ids, "event_id": event_id})
+
+    def remove_students_from_event(self, student_ids, event_id):
+        """Retire plusieurs élèves d'un événement (un seul calcul de prix)"""
+        student_ids = [str(sid) for sid in student_ids]
+        if student_ids:
+            self._apply({"op": "remove_many", "student_ids": student_ids, "event_id": event_id})
     
     def toggle_event_sales(self, event_id, enabled):
         """Active/désactive les ventes pour un événement"""
         if event_id in self.events_data["events"]:
-            self.events_data["events"][event_id]["ventes_activees"] = enabled
-            if not enabled:
-                # Si on désactive les ventes, remettre le total à 0
-                self.events_data["events"][event_id]["total_ventes"] = 0.0
-            self.calculate_event_prices(event_id)
-            self.save_data()
+            self._apply({"op": "toggle_sales", "event_id": event_id, "enabled": enabled})
     
     def update_event_sales_total(self, event_id, total_ventes):
         """Met à jour le total des ventes pour un événement"""
         if event_id in self.events_data["events"]:
-            self.events_data["events"][event_id]["total_ventes"] = float(total_ventes)
-            self.calculate_event_prices(event_id)
+            self._apply({"op": "sales_total", "event_id": event_id, "total_ventes": float(total_ventes)})
+
+    def purge_students(self, student_ids):
+        """
+        Supprime toutes les références à des élèves purgés (participants et
+        student_events), puis réécrit le snapshot une seule fois.
+        """
+        student_ids = [str(sid) for sid in student_ids]
+        if not student_ids:
+            return
+        self._apply({"op": "purge_students", "student_ids": student_ids})
+        self.save_data()
+
+    @contextmanager
+    def batch(self):
+        """
+        Unité de travail pour les opérations en masse :
+        with event_manager.batch():
+            ...
+        Le calcul des prix et l'écriture du journal sont différés à la fin du bloc
+        (une fois par événement touché).
+        """
+        if self._batch_depth == 0:
+            self._pending_records = []
+            self._dirty_events = set()
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit_batch()
+
+    def _commit_batch(self):
+        # Les modifications sont déjà en mémoire : on valide même après une erreur
+        with self.lock:
+            self._recalculate_dirty_events()
+            records, self._pending_records = self._pending_records, []
+            if records:
+                self.journal.append_many(records)
+                self._compact_if_needed()
+
+    def _apply(self, record):
+        """Applique une opération en mémoire puis l'ajoute au journal"""
+        with self.lock:
+            self._execute(record)
+
+            if self._batch_depth:
+                self._pending_records.append(record)
+                return
+
+            self.journal.append(record)
+            self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        # Compactage périodique du journal dans le snapshot
+        if len(self.journal) >= self.JOURNAL_COMPACT_THRESHOLD:
             self.save_data()
+
+    def _prices_changed(self, event_id):
+        """Recalcule les prix, ou les marque à recalculer pendant un batch"""
+        if self._dirty_events is not None:
+            self._dirty_events.add(event_id)
+        else:
+            self.calculate_event_prices(event_id)
+
+    def _recalculate_dirty_events(self):
+        dirty, self._dirty_events = self._dirty_events or set(), None
+        for event_id in dirty:
+            self.calculate_event_prices(event_id)
+
+    def _execute(self, record):
+        """Exécute une opération (appel direct ou rejeu du journal)"""
+        self.version += 1
+        handler = getattr(self, f"_op_{record['op']}", None)
+        if handler is None:
+            raise ValueError(f"Opération inconnue: {record['op']}")
+        handler(record)
+
+    def _op_assign(self, record):
+        self._assign_one(record["student_id"], record["event_id"])
+        self._prices_changed(record["event_id"])
+
+    def _op_assign_many(self, record):
+        for student_id in record["student_ids"]:
+            self._assign_one(student_id, record["event_id"])
+        self._prices_changed(record["event_id"])
+
+    def _op_remove(self, record):
+        self._remove_one(record["student_id"], record["event_id"])
+        self._prices_changed(record["event_id"])
+
+    def _op_remove_many(self, record):
+        for student_id in record["student_ids"]:
+            self._remove_one(student_id, record["event_id"])
+        self._prices_changed(record["event_id"])
+
+    def _assign_one(self, student_id, event_id):
+        # Ajouter à la liste des événements de l'élève
+        if student_id not in self.events_data["student_events"]:
+            self.events_data["student_events"][student_id] = []
+
+        if event_id not in self.events_data["student_events"][student_id]:
+            self.events_data["student_events"][student_id].append(event_id)
+
+        # Ajouter aux participants de l'événement
+        event = self.events_data["events"].get(event_id)
+        if event is not None:
+            if student_id not in event.participants:
+                self._index_add(event, (student_id,))
+            event.participants[student_id] = Participation()
+
+    def _remove_one(self, student_id, event_id):
+        # Retirer de la liste des événements de l'élève
+        if student_id in self.events_data["student_events"]:
+            if event_id in self.events_data["student_events"][student_id]:
+                self.events_data["student_events"][student_id].remove(event_id)
+
+        # Retirer des participants de l'événement
+        event = self.events_data["events"].get(event_id)
+        if event is not None and event.participants.pop(student_id, None) is not None:
+            self._index_remove(event, (student_id,))
+
+    def _op_purge_students(self, record):
+        student_ids = set(record["student_ids"])
+        student_events = self.events_data["student_events"]
+        for student_id in student_ids:
+            student_events.pop(student_id, None)
+
+        for event_id, event in self.events_data["events"].items():
+            participants = event.participants
+            removed = [sid for sid in student_ids if sid in participants]
+            if not removed:
+                continue
+            for student_id in removed:
+                del participants[student_id]
+            self._index_remove(event, removed)
+            self._prices_changed(event_id)
+
+    def _op_toggle_sales(self, record):
+        event_id = record["event_id"]
+        event = self.events_data["events"][event_id]
+        event.ventes_activees = bool(record["enabled"])
+        if not record["enabled"]:
+            # Si on désactive les ventes, remettre le total à 0
+            event.total_ventes = 0.0
+        self._prices_changed(event_id)
+
+    def _op_sales_total(self, record):
+        event_id = record["event_id"]
+        self.events_data["events"][event_id].total_ventes = float(record["total_ventes"])
+        self._prices_changed(event_id)
+
+    def _op_create_event(self, record):
+        event_data = record["event"]
+        event_id = event_data["id"]
+
+        if event_id in self.events_data["events"]:
+            raise ValueError("Un événement avec cet ID existe déjà")
+
+        event = Event.from_dict(event_data)
+        self.events_data["events"][event_id] = event
+        self._index_add(event, event.participants)
+
+    def _op_update_event(self, record):
+        event_id = record["event_id"]
+        if event_id not in self.events_data["events"]:
+            raise ValueError("Événement introuvable")
+
+        event = self.events_data["events"][event_id]
+        # Nom, catégorie ou date peuvent changer : réindexation de l'événement
+        self._index_remove(event, event.participants)
+        event.update(record["data"])
+        self._index_add(event, event.participants)
+        self._prices_changed(event_id)
     
     def calculate_event_prices(self, event_id):
         """Calcule les prix pour tous les participants d'un événement"""
@@ -155,27 +393,91 @@ class EventDataManager:
             return
         
         event = self.events_data["events"][event_id]
-        participants = event["participants"]
+        participants = event.participants
         
         if not participants:
             return
         
         # Calcul du prix de base par personne (toujours le même)
-        cout_total = event["cout_total"]
+        cout_total = event.cout_total or 0.0
         nb_participants = len(participants)
         prix_base = cout_total / nb_participants
         
         # Calcul de la réduction si les ventes sont activées
         reduction_par_personne = 0.0
-        # Utiliser get() pour éviter les KeyError
-        if event.get("ventes_activees", False) and event.get("total_ventes", 0.0) > 0:
-            reduction_par_personne = event.get("total_ventes", 0.0) / nb_participants
+        total_ventes = event.total_ventes or 0.0
+        if event.ventes_activees and total_ventes > 0:
+            reduction_par_personne = total_ventes / nb_participants
         
         # Mise à jour des prix pour chaque participant
-        for student_id, data in participants.items():
-            data["prix_base"] = prix_base
-            data["prix_final"] = max(0, prix_base - reduction_par_personne)
+        prix_final = max(0, prix_base - reduction_par_personne)
+        for participation in participants.values():
+            participation.prix_base = prix_base
+            participation.prix_final = prix_final
     
+    # =========================================================
+    # INDEX INVERSE (filtres par événement / catégorie / mois)
+    # =========================================================
+
+    @staticmethod
+    def _index_keys(event):
+        """Clés d'index d'un événement : nom, code catégorie, mois YYYYMM"""
+        keys = []
+        if event.nom:
+            keys.append(("nom", event.nom))
+        if event.categorie_code is not None:
+            keys.append(("categorie", event.categorie_code))
+        if event.month_key is not None:
+            keys.append(("mois", event.month_key))
+        return keys
+
+    def _index_add(self, event, student_ids):
+        if not student_ids:
+            return
+        for key in self._index_keys(event):
+            counts = self._student_index.setdefault(key, {})
+            for student_id in student_ids:
+                counts[student_id] = counts.get(student_id, 0) + 1
+
+    def _index_remove(self, event, student_ids):
+        for key in self._index_keys(event):
+            counts = self._student_index.get(key)
+            if counts is None:
+                continue
+            for student_id in student_ids:
+                count = counts.get(student_id, 0) - 1
+                if count > 0:
+                    counts[student_id] = count
+                else:
+                    counts.pop(student_id, None)
+            if not counts:
+                del self._student_index[key]
+
+    def _rebuild_student_index(self):
+        self._student_index = {}
+        for event in self.events_data["events"].values():
+            self._index_add(event, event.participants)
+
+    def _students_for(self, key):
+        # Vue sur les clés : test d'appartenance et intersections sans copie
+        return self._student_index.get(key, {}).keys()
+
+    def get_students_for_event_name(self, name):
+        """IDs (str) des élèves inscrits à un événement portant ce nom"""
+        return self._students_for(("nom", name))
+
+    def get_students_for_category(self, category):
+        """IDs (str) des élèves inscrits à un événement de cette catégorie"""
+        return self._students_for(("categorie", EVENT_CATEGORIES.lookup(category)))
+
+    def get_students_for_month(self, key):
+        """IDs (str) des élèves ayant un événement pendant le mois YYYYMM"""
+        return self._students_for(("mois", key))
+
+    def get_indexed_months(self):
+        """Clés mois (YYYYMM) ayant au moins un participant"""
+        return sorted(k[1] for k in self._student_index if k[0] == "mois")
+
     def get_student_events(self, student_id):
         """Retourne les événements d'un élève"""
         return self.events_data["student_events"].get(str(student_id), [])
@@ -183,29 +485,22 @@ class EventDataManager:
     def get_event_participants(self, event_id):
         """Retourne les participants d'un événement"""
         if event_id in self.events_data["events"]:
-            return self.events_data["events"][event_id]["participants"]
+            return self.events_data["events"][event_id].participants
         return {}
-    def create_event(self, event_data):
-        event_id = event_data["id"]
-
-        if event_id in self.events_data["events"]:
-            raise ValueError("Un événement avec cet ID existe déjà")
 
+    def create_event(self, event_data):
         # Sécurisation des champs obligatoires
         event_data.setdefault("participants", {})
         event_data.setdefault("ventes_activees", False)
         event_data.setdefault("total_ventes", 0.0)
         event_data.setdefault("description", "")
 
-        self.events_data["events"][event_id] = event_data
-        self.save_data()
+        self._apply({"op": "create_event", "event": event_data})
 
     def update_event(self, event_id, updated_data):
         if event_id not in self.events_data["events"]:
             raise ValueError("Événement introuvable")
 
-        event = self.events_data["events"][event_id]
-
         # Champs modifiables uniquement
         allowed_fields = [
             "nom",
@@ -216,12 +511,13 @@ class EventDataManager:
             "ventes_activees"
         ]
 
-        for field in allowed_fields:
-            if field in updated_data:
-                event[field] = updated_data[field]
+        data = {
+            field: updated_data[field]
+            for field in allowed_fields
+            if field in updated_data
+        }
 
-        self.calculate_event_prices(event_id)
-        self.save_data()
+        self._apply({"op": "update_event", "event_id": event_id, "data": data})
 
 # Instance globale
-event_manager = EventDataManager()
\ No newline at end of file
+event_manager = EventDataManager()
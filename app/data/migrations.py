@@ -0,0 +1,53 @@
+"""
+Migrations du format de events_assignments.json
+
+Le fichier porte un numéro de version ("schema_version").
+Chaque migration n'est exécutée qu'une fois : uniquement celles dont la version
+est supérieure à celle du fichier, dans l'ordre du registre.
+Pour faire évoluer le format : ajouter une fonction et une entrée à EVENT_MIGRATIONS.
+"""
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+def _add_sales_fields(data):
+    """v1 : champs de ventes sur les événements, prix_base/prix_final sur les participants"""
+    for event in data.get("events", {}).values():
+        # Ajouter les nouveaux champs s'ils n'existent pas
+        event.setdefault("ventes_activees", False)
+        event.setdefault("total_ventes", 0.0)
+
+        # Ancienne structure : {"vente": 0, "prix_final": 0}
+        # Nouvelle structure : {"prix_base": 0, "prix_final": 0}
+        for participant_data in event.get("participants", {}).values():
+            if "vente" in participant_data and "prix_base" not in participant_data:
+                # Supprimer l'ancien champ "vente" au niveau individuel
+                participant_data.pop("vente", None)
+            participant_data.setdefault("prix_base", 0.0)
+            participant_data.setdefault("prix_final", 0.0)
+
+
+# Registre ordonné : (version atteinte, migration)
+EVENT_MIGRATIONS = [
+    (1, _add_sales_fields),
+]
+
+EVENTS_SCHEMA_VERSION = EVENT_MIGRATIONS[-1][0]
+
+
+def run_migrations(data, migrations=EVENT_MIGRATIONS):
+    """
+    Applique les migrations manquantes sur data (en place).
+    Retourne True si au moins une migration a été exécutée.
+    """
+    version = data.get(SCHEMA_VERSION_KEY, 0)
+    migrated = False
+
+    for target_version, migration in migrations:
+        if version < target_version:
+            migration(data)
+            version = target_version
+            data[SCHEMA_VERSION_KEY] = version
+            migrated = True
+
+    return migrated
@@ -0,0 +1,109 @@
+import json
+import os
+
+
+class MutationJournal:
+    """
+    Journal append-only des modifications (une ligne JSON par opération)
+    - append() écrit et force l'écriture disque immédiatement
+    - read_records() relit les opérations depuis le dernier compactage et coupe
+      le fichier après la dernière ligne valide (fin d'écriture interrompue)
+    - rotate() met de côté le segment courant au moment où un snapshot est capturé,
+      discard_rotated() le supprime une fois ce snapshot écrit sur disque
+    """
+
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self.rotated_file = journal_file + ".1"
+        self._handle = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def read_records(self):
+        """Retourne les opérations journalisées (segment mis de côté puis segment courant)"""
+        rotated = self._read_file(self.rotated_file)
+        current = self._read_file(self.journal_file)
+        self._count = len(current)
+        return rotated + current
+
+    def _read_file(self, path):
+        records = []
+        if not os.path.exists(path):
+            return records
+
+        valid_end = 0  # octet de fin de la dernière ligne valide
+        corrupt = False
+        with open(path, 'rb') as f:
+            for raw in f:
+                try:
+                    # Ligne sans fin de ligne : écriture interrompue avant la fin
+                    if not raw.endswith(b"\n"):
+                        raise ValueError
+                    line = raw.decode('utf-8').strip()
+                    if line:
+                        records.append(json.loads(line))
+                except ValueError:
+                    # Écriture interrompue (crash) : on s'arrête à la dernière ligne valide
+                    print(f"Journal: ligne corrompue ignorée dans {path}")
+                    corrupt = True
+                    break
+                valid_end += len(raw)
+
+        if corrupt:
+            # Sinon les prochains ajouts seraient collés à la ligne corrompue et perdus
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+                f.flush()
+                os.fsync(f.fileno())
+        return records
+
+    def append(self, record):
+        """Ajoute une opération au journal et la rend durable"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Ajoute plusieurs opérations en une seule écriture disque"""
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+            self._handle = open(self.journal_file, 'a', encoding='utf-8')
+
+        self._handle.write("".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._count += len(records)
+
+    def rotate(self):
+        """
+        Met de côté le segment courant (appelé pendant la capture d'un snapshot).
+        Les opérations suivantes partent dans un nouveau segment.
+        """
+        self.close()
+        self._count = 0
+        if not os.path.exists(self.journal_file):
+            return
+
+        if os.path.exists(self.rotated_file):
+            # Snapshot précédent jamais écrit : on conserve les deux segments
+            with open(self.rotated_file, 'a', encoding='utf-8') as dst, \
+                    open(self.journal_file, 'r', encoding='utf-8') as src:
+                dst.write(src.read())
+            os.remove(self.journal_file)
+        else:
+            os.replace(self.journal_file, self.rotated_file)
+
+    def discard_rotated(self):
+        """Supprime le segment mis de côté (son contenu est dans le snapshot)"""
+        if os.path.exists(self.rotated_file):
+            os.remove(self.rotated_file)
+
+    def has_records(self):
+        return self._count > 0 or os.path.exists(self.rotated_file)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
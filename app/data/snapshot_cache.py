@@ -0,0 +1,99 @@
+"""
+Cache binaire des fichiers JSON de données (démarrage à chaud)
+
+À côté de chaque fichier JSON, un fichier <nom>.json.cache contient les mêmes
+données au format marshal, précédées d'un en-tête (taille et mtime du JSON,
+empreinte du blob). Le JSON reste la source de vérité : le cache n'est utilisé que
+si la taille et la mtime du JSON présent sur le disque sont celles de l'en-tête,
+ce qui évite de relire le JSON au démarrage.
+
+marshal n'est pas conçu pour des données non fiables : un blob abîmé peut faire
+échouer ou planter marshal.loads. L'empreinte du blob est donc vérifiée avant le
+chargement ; elle détecte une corruption, pas une modification volontaire du cache.
+"""
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+
+from data.background_writer import atomic_write
+from utils.logger import log_error
+
+CACHE_SUFFIX = ".cache"
+MAGIC = b"PTSC"
+# Le format marshal dépend de la version de Python
+FORMAT = (2, marshal.version, sys.version_info[:2])
+
+
+def cache_path(json_path):
+    return json_path + CACHE_SUFFIX
+
+
+def _digest(raw):
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def encode_snapshot(data):
+    """Sérialise data en JSON (bytes) et en blob marshal ; à appeler sous le lock des données"""
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return payload, marshal.dumps(data)
+
+
+def save_cache(json_path, payload, blob):
+    """Écrit le cache d'un JSON qui vient d'être écrit avec le contenu payload"""
+    try:
+        st = os.stat(json_path)
+        if st.st_size != len(payload):
+            # JSON déjà remplacé par une autre écriture : pas de cache pour lui
+            return
+        header = marshal.dumps((FORMAT, st.st_size, st.st_mtime_ns, _digest(blob)))
+        atomic_write(
+            cache_path(json_path),
+            MAGIC + struct.pack("<I", len(header)) + header + blob
+        )
+    except Exception as e:
+        # Le cache est facultatif : une erreur ne doit pas bloquer la sauvegarde
+        log_error(e, f"Cache binaire non écrit: {json_path}")
+
+
+def _read_cache(json_path, st):
+    """Retourne le blob si l'en-tête correspond à la taille/mtime du JSON et à son empreinte"""
+    try:
+        with open(cache_path(json_path), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (header_size,) = struct.unpack("<I", f.read(4))
+            fmt, size, mtime_ns, digest = marshal.loads(f.read(header_size))
+            if fmt != FORMAT or size != st.st_size or mtime_ns != st.st_mtime_ns:
+                return None
+            blob = f.read()
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+    # Blob corrompu : jamais transmis à marshal.loads
+    return blob if _digest(blob) == digest else None
+
+
+def load_json(json_path, use_cache=True):
+    """
+    Charge un fichier JSON, via son cache binaire s'il est à jour.
+    Sinon le JSON est lu normalement et le cache régénéré.
+    """
+    if not use_cache:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    st = os.stat(json_path)
+    blob = _read_cache(json_path, st)
+    if blob is not None:
+        try:
+            return marshal.loads(blob)
+        except (ValueError, EOFError, TypeError):
+            pass
+
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+    save_cache(json_path, raw, marshal.dumps(data))
+    return data
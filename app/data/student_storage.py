@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+
+from data.background_writer import atomic_write
+from data.snapshot_cache import load_json, encode_snapshot, save_cache
+from model.student import Student
+
+
+class StudentStorage:
+    """
+    Interface commune des moteurs de stockage des élèves
+    - load_all() : charge toutes les fiches (supprimées comprises), en dicts JSON
+    - save_all() : réécrit l'ensemble du stockage (fiches Student) ; on_written est
+      appelé une fois l'écriture faite (plus tard si deferred_writes)
+    - save_student() : écrit une seule fiche
+    Le compteur d'ID (next_id) est persisté avec les fiches et relu par load_all()
+    """
+
+    # True si le moteur sait écrire une fiche sans tout réécrire
+    supports_row_writes = False
+
+    # True si save_all() ne fait que programmer l'écriture (thread d'écriture)
+    deferred_writes = False
+
+    # Compteur d'ID lu au dernier chargement (None si absent)
+    next_id = None
+
+    def load_all(self):
+        raise NotImplementedError
+
+    def save_all(self, students, next_id=None, on_written=None):
+        raise NotImplementedError
+
+    def save_student(self, student, next_id=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonStudentStorage(StudentStorage):
+    """
+    Stockage historique : un seul fichier students_data.json
+    Avec un writer, save_all() est différé au thread d'écriture (sous lock)
+    Avec use_cache, un cache binaire accompagne le JSON (voir snapshot_cache)
+    """
+
+    def __init__(self, data_file, writer=None, lock=None, use_cache=False):
+        self.data_file = data_file
+        self.writer = writer
+        self.lock = lock
+        self.use_cache = use_cache
+        self.deferred_writes = writer is not None
+
+    def load_all(self):
+        if not os.path.exists(self.data_file):
+            return None
+
+        data = load_json(self.data_file, self.use_cache)
+        self.next_id = data.get('next_id')
+        return data.get('students', [])
+
+    def save_all(self, students, next_id=None, on_written=None):
+        snapshot = {}
+
+        def encode():
+            data = {'students': [s.to_dict() for s in students]}
+            if next_id is not None:
+                data['next_id'] = next_id
+            snapshot['payload'], snapshot['blob'] = encode_snapshot(data)
+
+        def build_payload():
+            if self.lock is None:
+                encode()
+            else:
+                with self.lock:
+                    encode()
+            return snapshot['payload']
+
+        def written():
+            if self.use_cache:
+                save_cache(self.data_file, snapshot['payload'], snapshot['blob'])
+            if on_written is not None:
+                on_written()
+
+        if self.writer is not None:
+            self.writer.schedule(self.data_file, build_payload, written)
+        else:
+            atomic_write(self.data_file, build_payload())
+            written()
+
+
+class SqliteStudentStorage(StudentStorage):
+    """
+    Stockage SQLite : une ligne par élève
+    Index sur id (clé primaire), classe, annee et (nom, prenom)
+    Les champs non prévus par le schéma sont conservés dans la colonne extra (JSON)
+    """
+
+    supports_row_writes = True
+
+    COLUMNS = ("id", "nom", "prenom", "classe", "annee", "email", "deleted")
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS students (
+                    id INTEGER PRIMARY KEY,
+                    nom TEXT,
+                    prenom TEXT,
+                    classe TEXT,
+                    annee TEXT,
+                    email TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    extra TEXT
+                )
+                """
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_students_classe ON students (classe)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_students_annee ON students (annee)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_students_nom_prenom ON students (nom, prenom)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM students LIMIT 1").fetchone() is None
+
+    def is_initialized(self):
+        """
+        True si la base a déjà servi (import JSON fait, ou compteur d'ID enregistré).
+        Une table vidée (purge, replace_all([])) reste initialisée : le JSON n'est
+        pas réimporté.
+        """
+        row = self.conn.execute(
+            "SELECT 1 FROM meta WHERE key IN ('imported_from_json', 'next_id') LIMIT 1"
+        ).fetchone()
+        # Base antérieure au marqueur : des lignes suffisent
+        return row is not None or not self.is_empty()
+
+    def mark_initialized(self):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from_json', '1')"
+            )
+
+    def import_json(self, json_file):
+        """Importe un students_data.json existant (première utilisation du moteur SQLite)"""
+        source = JsonStudentStorage(json_file)
+        students = source.load_all()
+        if students:
+            self.save_all([Student.from_dict(s) for s in students], source.next_id)
+        self.mark_initialized()
+        return len(students or [])
+
+    # ===== Conversion fiche <-> ligne =====
+    def _to_row(self, student):
+        student = student.to_dict()
+        extra = {k: v for k, v in student.items() if k not in self.COLUMNS}
+        return (
+            student.get("id"),
+            student.get("nom"),
+            student.get("prenom"),
+            student.get("classe"),
+            student.get("annee"),
+            student.get("email"),
+            1 if student.get("deleted", False) else 0,
+            json.dumps(extra, ensure_ascii=False) if extra else None
+        )
+
+    def _from_row(self, row):
+        student = json.loads(row[7]) if row[7] else {}
+        for column, value in zip(self.COLUMNS, row):
+            if column == "deleted":
+                student["deleted"] = bool(value)
+            elif value is not None:
+                student[column] = value
+        return student
+
+    # ===== API =====
+    def load_all(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        self.next_id = int(row[0]) if row else None
+
+        rows = self.conn.execute(
+            "SELECT id, nom, prenom, classe, annee, email, deleted, extra FROM students ORDER BY id"
+        ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def _save_next_id(self, next_id):
+        if next_id is not None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)",
+                (str(next_id),)
+            )
+
+    def save_all(self, students, next_id=None, on_written=None):
+        with self.conn:
+            self.conn.execute("DELETE FROM students")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._to_row(s) for s in students]
+            )
+            self._save_next_id(next_id)
+        if on_written is not None:
+            on_written()
+
+    def save_student(self, student, next_id=None):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._to_row(student)
+            )
+            self._save_next_id(next_id)
+
+    def close(self):
+        self.conn.close()
+
+
+def create_student_storage(resolver, backend="json", writer=None, lock=None, use_cache=False):
+    """Instancie le moteur de stockage choisi dans les paramètres"""
+    json_file = resolver.get_file("students_data.json")
+
+    if backend == "sqlite":
+        storage = SqliteStudentStorage(resolver.get_file("students_data.db"))
+        # Première utilisation seulement : reprise des données JSON existantes
+        if not storage.is_initialized():
+            if os.path.exists(json_file):
+                count = storage.import_json(json_file)
+                print(f"Migration JSON -> SQLite: {count} étudiants")
+            else:
+                storage.mark_initialized()
+        return storage
+
+    return JsonStudentStorage(json_file, writer, lock, use_cache)
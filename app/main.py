@@ -27,6 +27,10 @@ from views.settings_view import SettingsView
 from controller.ExcelImportController import ExcelImportController
 from popups.EventFormPopup import EventFormPopup
 
+# ===== Données =====
+from data.event_data_manager import event_manager
+from data.background_writer import background_writer
+
 
 # ====================================================
 #  MODE
@@ -147,6 +151,12 @@ class MainApplication:
         # Fin splash
         self.root.after(100, self.splash.destroy)
 
+        # Fermeture : compactage des données avant de quitter
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Erreurs des sauvegardes en arrière-plan
+        self.poll_save_errors()
+
         # Update
         self.check_update_background()
 
@@ -269,8 +279,29 @@ class MainApplication:
     def start_update(self):
         launcher = os.path.join(os.path.dirname(__file__), "launcher.py")
         subprocess.Popen([sys.executable, launcher, "--update"])
+        self.on_close()
+
+    # ====================================================
+    #  FERMETURE
+    # ====================================================
+    def on_close(self):
+        try:
+            event_manager.close()
+            background_writer.flush()
+        except Exception as e:
+            print(f"Erreur sauvegarde à la fermeture: {e}")
         self.root.destroy()
 
+    def poll_save_errors(self):
+        errors = background_writer.pop_errors()
+        if errors:
+            details = "\n".join(f"• {os.path.basename(path)} : {e}" for path, e in errors)
+            messagebox.showerror(
+                "Erreur de sauvegarde",
+                f"Certaines données n'ont pas pu être enregistrées.\n\n{details}"
+            )
+        self.root.after(1000, self.poll_save_errors)
+
     # ====================================================
     #  RUN
     # ====================================================
@@ -0,0 +1,64 @@
+import sys
+import threading
+
+
+class CategoryTable:
+    """
+    Table de valeurs partagée d'une colonne catégorielle (encodage par dictionnaire)
+    Les fiches stockent un petit entier (code) ; la valeur est stockée une seule fois ici.
+    Les codes ne sont jamais réattribués : une valeur garde son code pendant toute l'exécution.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.values = []   # code -> valeur
+        self._codes = {}   # valeur -> code
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        """Code de value (ajoutée à la table si nouvelle) ; None reste None"""
+        if value is None:
+            return None
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    if isinstance(value, str):
+                        value = sys.intern(value)
+                    code = len(self.values)
+                    self.values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def decode(self, code):
+        return None if code is None else self.values[code]
+
+    def lookup(self, value):
+        """Code de value sans l'ajouter (None si la valeur n'existe pas)"""
+        if value is None:
+            return None
+        return self._codes.get(value)
+
+
+# Tables globales (partagées par toutes les fiches)
+CLASSES = CategoryTable("classe")
+YEARS = CategoryTable("annee")
+OPTIONS = CategoryTable("option")
+EVENT_CATEGORIES = CategoryTable("categorie")
+
+
+def category_property(table, code_attr):
+    """Attribut décodé (fiche.classe) adossé à l'attribut code (fiche.classe_code)"""
+
+    def getter(self):
+        code = getattr(self, code_attr)
+        return None if code is None else table.values[code]
+
+    def setter(self, value):
+        setattr(self, code_attr, table.encode(value))
+
+    return property(getter, setter)
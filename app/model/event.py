@@ -0,0 +1,83 @@
+from model.record import Record, to_float, to_str
+from model.categories import EVENT_CATEGORIES, category_property
+from utils.date_utils import parse_event_date, month_key
+
+
+class Participation(Record):
+    """Participation d'un élève à un événement (prix calculés par EventDataManager)"""
+
+    __slots__ = ("prix_base", "prix_final")
+
+    FIELDS = __slots__
+
+    def __init__(self, values=None):
+        super().__init__(values)
+        if self.prix_base is None:
+            self.prix_base = 0.0
+        if self.prix_final is None:
+            self.prix_final = 0.0
+
+    def _normalize(self, field, value):
+        return to_float(value)
+
+
+class Event(Record):
+    """
+    Événement (une entrée de events_assignments.json["events"])
+    participants : student_id (str) -> Participation
+    categorie est encodée (categorie_code) dans une table partagée
+    date reste le texte du fichier ; elle est analysée une seule fois à l'affectation :
+    date_value (date ou None), date_ordinal (tri) et month_key (YYYYMM)
+    """
+
+    __slots__ = (
+        "id", "nom", "date_text", "date_value", "date_ordinal", "month_key",
+        "categorie_code", "cout_total", "ventes_activees", "total_ventes",
+        "participants", "description"
+    )
+
+    FIELDS = (
+        "id", "nom", "date", "categorie", "cout_total",
+        "ventes_activees", "total_ventes", "participants", "description"
+    )
+
+    categorie = category_property(EVENT_CATEGORIES, "categorie_code")
+
+    @property
+    def date(self):
+        return self.date_text
+
+    @date.setter
+    def date(self, value):
+        self.date_text = value
+        parsed = parse_event_date(value)
+        if parsed is None:
+            self.date_value = self.date_ordinal = self.month_key = None
+        else:
+            self.date_value = parsed.date()
+            self.date_ordinal = self.date_value.toordinal()
+            self.month_key = month_key(parsed)
+
+    def __init__(self, values=None):
+        super().__init__(values)
+        if self.participants is None:
+            self.participants = {}
+
+    def _normalize(self, field, value):
+        if field in ("cout_total", "total_ventes"):
+            return to_float(value)
+        if field == "ventes_activees":
+            return bool(value)
+        if field == "participants":
+            return {
+                str(student_id): p if isinstance(p, Participation) else Participation.from_dict(p)
+                for student_id, p in (value or {}).items()
+            }
+        if field == "id":
+            return value
+        return to_str(value)
+
+    def _serialize(self, field, value):
+        if field == "participants":
+            return {student_id: p.to_dict() for student_id, p in value.items()}
+        return value
@@ -0,0 +1,133 @@
+_MISSING = object()
+
+
+class Record:
+    """
+    Base des enregistrements typés (__slots__, pas de __dict__ par instance)
+    - les champs connus (FIELDS) sont des attributs normalisés une seule fois
+    - les champs inconnus du fichier sont conservés dans extra, ainsi que les valeurs
+      d'un champ connu qui ne peuvent pas être converties
+    - interface dict minimale (get, [], in, update, to_dict) pour le code existant
+    Un champ à None est considéré comme absent.
+    """
+
+    __slots__ = ("extra",)
+
+    FIELDS = ()
+
+    def __init__(self, values=None):
+        self.extra = None
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        if values:
+            self.update(values)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def _normalize(self, field, value):
+        """Conversion de type d'un champ connu (à surcharger)"""
+        return value
+
+    def _serialize(self, field, value):
+        """Valeur écrite dans le JSON pour un champ connu (à surcharger)"""
+        return value
+
+    def to_dict(self):
+        """Retourne le dict JSON équivalent (champs connus puis champs extra)"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = self._serialize(field, value)
+        if self.extra:
+            for key, value in self.extra.items():
+                data.setdefault(key, value)
+        return data
+
+    # ===== Interface dict =====
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            normalized = self._normalize(key, value)
+            setattr(self, key, normalized)
+            if normalized is None and value is not None and value != "":
+                # Valeur non convertible ("P" pour une année) : conservée telle quelle
+                # dans extra pour être réécrite à l'identique
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+            elif self.extra and key in self.extra:
+                del self.extra[key]
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def copy(self):
+        return self.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def to_int(value):
+    """Entier ou None ("1", 1, 1.0 -> 1) ; "1ère" ou "12abc" ne sont pas convertis"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    text = str(value).strip()
+    return int(text) if text.isascii() and text.isdigit() else None
+
+
+def to_float(value):
+    """Flottant ; une valeur illisible est conservée telle quelle"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def to_str(value):
+    if value is None:
+        return None
+    return str(value).strip()
@@ -0,0 +1,46 @@
+from model.record import Record, to_int, to_str
+from model.categories import CLASSES, YEARS, OPTIONS, category_property
+
+
+class Student(Record):
+    """
+    Élève (une entrée de students_data.json)
+    annee est un entier en mémoire, écrit en texte dans le JSON ("1") comme avant
+    classe, annee et option sont encodées (classe_code, ...) dans des tables partagées
+    """
+
+    __slots__ = (
+        "id", "nom", "prenom", "classe_code", "annee_code", "email",
+        "option_code", "source", "deleted", "deleted_at"
+    )
+
+    FIELDS = (
+        "id", "nom", "prenom", "classe", "annee", "email", "option", "source",
+        "deleted", "deleted_at"
+    )
+
+    classe = category_property(CLASSES, "classe_code")
+    annee = category_property(YEARS, "annee_code")
+    option = category_property(OPTIONS, "option_code")
+
+    def _normalize(self, field, value):
+        if field in ("id", "annee"):
+            return to_int(value)
+        if field == "deleted":
+            return bool(value)
+        if field == "deleted_at":
+            return value or None
+        return to_str(value)
+
+    def _serialize(self, field, value):
+        if field == "annee":
+            return str(value)
+        return value
+
+    def to_dict(self):
+        data = super().to_dict()
+        # Fiche active : pas de champ "deleted" dans le fichier
+        if not self.deleted:
+            data.pop("deleted", None)
+            data.pop("deleted_at", None)
+        return data
@@ -184,17 +184,18 @@ class CostCalculatorPopup:
 
         total_ventes = float(self.money_amount_var.get()) if self.money_enabled_var.get() else 0.0
 
-        # Mise à jour ventes globales
-        event_manager.toggle_event_sales(self.event_id, self.money_enabled_var.get())
-        event_manager.update_event_sales_total(self.event_id, total_ventes)
-
-        # Assurer que tous les élèves sont bien participants
-        for student_id in self.selected_students:
-            if str(student_id) not in self.event["participants"]:
-                event_manager.assign_student_to_event(student_id, self.event_id)
-
-        event_manager.calculate_event_prices(self.event_id)
-        event_manager.save_data()
+        # Une seule unité de travail : prix recalculés et journal écrit une fois
+        with event_manager.batch():
+            # Mise à jour ventes globales
+            event_manager.toggle_event_sales(self.event_id, self.money_enabled_var.get())
+            event_manager.update_event_sales_total(self.event_id, total_ventes)
+
+            # Assurer que tous les élèves sont bien participants
+            missing = [
+                student_id for student_id in self.selected_students
+                if str(student_id) not in self.event["participants"]
+            ]
+            event_manager.assign_students_to_event(missing, self.event_id)
 
         messagebox.showinfo("✅ Succès", "Coûts enregistrés avec succès")
         self.popup.destroy()
@@ -183,13 +183,14 @@ class EventFormPopup:
             return
 
         students = get_all_students()
-        added = 0
 
-        for student in students:
-            if (year and student.get("annee") == year) or \
-               (classe and student.get("classe") == classe):
-                event_manager.assign_student_to_event(student["id"], self.event["id"])
-                added += 1
+        student_ids = [
+            student["id"] for student in students
+            if (year and student.get("annee") == year) or
+               (classe and student.get("classe") == classe)
+        ]
+        event_manager.assign_students_to_event(student_ids, self.event["id"])
+        added = len(student_ids)
 
         self.on_save_callback()
 
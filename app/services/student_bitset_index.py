@@ -0,0 +1,149 @@
+from model.categories import CLASSES, YEARS
+
+# Positions des bits à 1 pour chaque valeur d'octet (extraction rapide des résultats)
+_BIT_POSITIONS = [
+    tuple(bit for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+
+def _to_bitset(positions, size):
+    """Liste de positions -> entier dont les bits correspondants sont à 1"""
+    bits = bytearray((size + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+class StudentBitsetIndex:
+    """
+    Index des filtres de la liste des élèves
+    Pour chaque valeur (année, classe, catégorie, événement, mois) : un bitset
+    (entier Python) des positions des élèves dans la liste indexée.
+    Catégories et événements sont calculés à la demande (depuis l'index inverse
+    d'EventDataManager) puis gardés jusqu'à la prochaine modification.
+    Un filtrage = ET des bitsets sélectionnés (voir StudentFilterService),
+    puis extraction des élèves (gather).
+    L'index est reconstruit quand la liste ou une des versions des données change.
+    """
+
+    def __init__(self, student_manager, event_manager):
+        self.student_manager = student_manager
+        self.event_manager = event_manager
+        self._key = None
+        self._students = []
+        self._all = 0
+        self._by_year = {}
+        self._by_class = {}
+        self._by_category = {}
+        self._by_event = {}
+        self._by_month = {}
+        self._position = {}
+
+    def _ensure_fresh(self, students):
+        key = (
+            id(students), len(students),
+            self.student_manager.version, self.event_manager.version
+        )
+        if key != self._key:
+            self._build(students)
+            self._key = key
+
+    def _build(self, students):
+        # Les ensembles d'élèves par événement / catégorie / mois viennent de
+        # l'index inverse d'EventDataManager : pas de parcours des événements ici
+        by_year, by_class = {}, {}
+        position = {}
+        for pos, student in enumerate(students):
+            position[str(student.id)] = pos
+            if student.annee_code is not None:
+                by_year.setdefault(student.annee_code, []).append(pos)
+            if student.classe_code is not None:
+                by_class.setdefault(student.classe_code, []).append(pos)
+
+        size = len(students)
+
+        def bitset(student_ids):
+            return _to_bitset(
+                [position[sid] for sid in student_ids if sid in position], size
+            )
+
+        em = self.event_manager
+        self._students = students
+        self._all = (1 << size) - 1
+        self._by_year = {k: _to_bitset(v, size) for k, v in by_year.items()}
+        self._by_class = {k: _to_bitset(v, size) for k, v in by_class.items()}
+        self._by_category = {}
+        self._by_event = {}
+        self._by_month = {
+            key: bitset(em.get_students_for_month(key))
+            for key in em.get_indexed_months()
+        }
+        self._position = position
+
+    def _cached(self, cache, value, student_ids):
+        """Bitset d'une valeur d'événement, calculé à la première demande"""
+        mask = cache.get(value)
+        if mask is None:
+            position = self._position
+            mask = _to_bitset(
+                [position[sid] for sid in student_ids() if sid in position],
+                len(self._students)
+            )
+            cache[value] = mask
+        return mask
+
+    def predicate_masks(self, query):
+        """
+        Bitsets des filtres actifs de query (StudentQuery) : [(nom du filtre, bitset)]
+        Les bitsets d'événements et de catégories sont calculés à la demande.
+        """
+        masks = []
+
+        if query.year is not None:
+            masks.append(("annee", self._by_year.get(YEARS.lookup(query.year), 0)))
+
+        if query.classe is not None:
+            masks.append(("classe", self._by_class.get(CLASSES.lookup(query.classe), 0)))
+
+        em = self.event_manager
+        category = query.event_category
+        if category is not None:
+            masks.append(("categorie", self._cached(
+                self._by_category, category,
+                lambda: em.get_students_for_category(category)
+            )))
+
+        event_name = query.event
+        if event_name is not None:
+            masks.append(("evenement", self._cached(
+                self._by_event, event_name,
+                lambda: em.get_students_for_event_name(event_name)
+            )))
+
+        # Mois : clé entière YYYYMM
+        if query.month is not None:
+            masks.append(("mois", self._by_month.get(query.month, 0)))
+
+        return masks
+
+    def gather(self, mask):
+        """Élèves correspondant aux bits à 1 de mask (ordre de la liste indexée)"""
+        students = self._students
+        if mask is None:
+            return list(students)
+        if not mask:
+            return []
+
+        result = []
+        data = mask.to_bytes((len(students) + 7) // 8, "little")
+        for index, byte in enumerate(data):
+            if byte:
+                base = index << 3
+                for bit in _BIT_POSITIONS[byte]:
+                    result.append(students[base + bit])
+        return result
+
+    def prepare(self, students):
+        """Indexe students (sans effet si la liste et les données n'ont pas changé)"""
+        self._ensure_fresh(students)
@@ -1,105 +1,177 @@
-from datetime import datetime
+import time
+from collections import OrderedDict
+
+from model.record import to_int
+from services.student_bitset_index import StudentBitsetIndex
+from services.student_search import IncrementalSearch
+from services.student_sort_ranks import StudentSortRanks
+
+
+class StudentQuery:
+    """
+    Requête de la liste des élèves, compilée depuis StudentView.get_filters()
+    Les valeurs "Toutes" / "Tous" / vides deviennent None (filtre inactif).
+    """
+
+    __slots__ = ("year", "classe", "event_category", "event", "month", "search", "fuzzy", "sort")
+
+    def __init__(self, year=None, classe=None, event_category=None, event=None,
+                 month=None, search="", fuzzy=False, sort=None):
+        self.year = year
+        self.classe = classe
+        self.event_category = event_category
+        self.event = event
+        self.month = month
+        self.search = search
+        self.fuzzy = fuzzy
+        self.sort = sort
+
+    @classmethod
+    def from_filters(cls, filters):
+        def selected(value, all_label):
+            return None if not value or value == all_label else value
+
+        year = selected(filters.get("year"), "Toutes")
+        return cls(
+            year=to_int(year) if year is not None else None,
+            classe=selected(filters.get("class"), "Toutes"),
+            event_category=selected(filters.get("event_category"), "Toutes"),
+            event=selected(filters.get("event"), "Tous"),
+            month=filters.get("month"),
+            search=(filters.get("search") or "").strip(),
+            fuzzy=bool(filters.get("fuzzy")),
+            sort=filters.get("sort"),
+        )
+
+    def index_key(self):
+        """Clé des filtres indexés (tout sauf recherche et tri)"""
+        return (self.year, self.classe, self.event_category, self.event, self.month)
+
+    def key(self):
+        """Clé complète de la requête (cache des résultats)"""
+        return self.index_key() + (self.search, self.fuzzy, self.sort)
 
 
 class StudentFilterService:
-
-    @staticmethod
-    def filter_students(students, filters, event_manager):
-        result = students
-
-        result = StudentFilterService._filter_year(result, filters)
-        result = StudentFilterService._filter_class(result, filters)
-        result = StudentFilterService._filter_event(result, filters, event_manager)
-        result = StudentFilterService._filter_month(result, filters, event_manager)
-        result = StudentFilterService._filter_search(result, filters)
-
-        return StudentFilterService._sort(result, filters, event_manager)
-
-    @staticmethod
-    def _filter_year(students, filters):
-        if filters["year"] == "Toutes":
-            return students
-
-        year = filters["year"].replace("ère", "").replace("ème", "").replace("e", "")
-        return [s for s in students if str(s.get("annee")) == year]
-
-    @staticmethod
-    def _filter_class(students, filters):
-        if filters["class"] == "Toutes":
-            return students
-        return [s for s in students if s.get("classe") == filters["class"]]
-
-    @staticmethod
-    def _filter_event(students, filters, event_manager):
-        if filters["event"] == "Tous":
-            return students
-
-        filtered = []
-        for s in students:
-            events = event_manager.get_student_events(s["id"])
-            for eid in events:
-                ev = event_manager.get_event(eid)
-                if ev and ev.get("nom") == filters["event"]:
-                    filtered.append(s)
-                    break
-        return filtered
-
-    @staticmethod
-    def _filter_month(students, filters, event_manager):
-        if filters["month"] == "Tous":
-            return students
-
-        filtered = []
-        for s in students:
-            for eid in event_manager.get_student_events(s["id"]):
-                ev = event_manager.get_event(eid)
-                if ev and ev.get("date"):
-                    try:
-                        d = datetime.strptime(ev["date"], "%Y-%m-%d")
-                        if d.strftime("%B %Y") == filters["month"]:
-                            filtered.append(s)
-                            break
-                    except Exception:
-                        continue
-        return filtered
-
-    @staticmethod
-    def _filter_search(students, filters):
-        if not filters["search"]:
-            return students
-
-        text = filters["search"].lower()
-        return [
-            s for s in students
-            if text in s.get("nom", "").lower()
-            or text in s.get("prenom", "").lower()
-        ]
-
-    @staticmethod
-    def _sort(students, filters, event_manager):
-        sort_type = filters["sort"]
-
-        if sort_type == "Nom A-Z":
-            return sorted(students, key=lambda x: x.get("nom", "").lower())
-        if sort_type == "Nom Z-A":
-            return sorted(students, key=lambda x: x.get("nom", "").lower(), reverse=True)
-        if sort_type == "Classe":
-            return sorted(students, key=lambda x: (x.get("annee", 0), x.get("classe", "")))
-        if sort_type == "Année":
-            return sorted(students, key=lambda x: x.get("annee", 0))
-
-        if sort_type == "Date (Mois)":
-            def next_event_date(student):
-                dates = []
-                for eid in event_manager.get_student_events(student["id"]):
-                    ev = event_manager.get_event(eid)
-                    if ev and ev.get("date"):
-                        try:
-                            dates.append(datetime.strptime(ev["date"], "%Y-%m-%d"))
-                        except Exception:
-                            pass
-                return min(dates) if dates else datetime.max
-
-            return sorted(students, key=next_event_date)
-
-        return students
+    """
+    Planificateur unique des filtres de la liste des élèves
+    1. filtres indexés (année, classe, catégorie, événement, mois) : bitsets combinés
+       du plus sélectif au moins sélectif, arrêt dès que le résultat est vide
+    2. extraction des élèves retenus
+    3. recherche texte (exacte incrémentale ou approchée)
+    4. tri par rangs précalculés, puis classement des résultats de recherche
+    Les durées de chaque étape de la dernière exécution sont dans last_timings.
+    Les derniers résultats sont gardés dans un cache LRU, vidé à chaque modification
+    des données (versions de StudentDataManager et EventDataManager).
+    """
+
+    # Nombre de combinaisons de filtres gardées en cache
+    CACHE_SIZE = 32
+
+    def __init__(self, student_manager, event_manager):
+        self.student_manager = student_manager
+        self.event_manager = event_manager
+        self.index = StudentBitsetIndex(student_manager, event_manager)
+        self.search = IncrementalSearch(student_manager.search_index, student_manager.fuzzy_index)
+        self.sort_ranks = StudentSortRanks(student_manager, event_manager)
+        self.last_timings = []  # [(étape, durée en ms, nb d'élèves en sortie)]
+
+        self._cache = OrderedDict()  # clé de requête -> tuple d'élèves triés
+        self._cache_version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def filter_students(self, students, filters):
+        """Applique filters (dict de StudentView.get_filters()) à students"""
+        return self.execute(students, StudentQuery.from_filters(filters))
+
+    def execute(self, students, query):
+        start = time.perf_counter()
+
+        version = (self.student_manager.version, self.event_manager.version)
+        if version != self._cache_version:
+            # Données modifiées : tous les résultats en cache sont périmés
+            self._cache.clear()
+            self._cache_version = version
+
+        key = (id(students), len(students)) + query.key()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            self.last_timings = [("cache", (time.perf_counter() - start) * 1000, len(cached))]
+            return list(cached)
+        self.cache_misses += 1
+
+        result = self._execute(students, query, start)
+
+        self._cache[key] = tuple(result)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def cache_stats(self):
+        """Compteurs du cache des résultats (diagnostic)"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "capacity": self.CACHE_SIZE,
+        }
+
+    def _execute(self, students, query, start):
+        timings = []
+
+        def stage(name, count):
+            nonlocal start
+            now = time.perf_counter()
+            timings.append((name, (now - start) * 1000, count))
+            start = now
+
+        self.index.prepare(students)
+        stage("index", len(students))
+
+        # Plus petit bitset d'abord : le ET s'arrête dès que le résultat est vide
+        masks = sorted(
+            self.index.predicate_masks(query),
+            key=lambda item: item[1].bit_count()
+        )
+        mask = None
+        for name, predicate_mask in masks:
+            mask = predicate_mask if mask is None else mask & predicate_mask
+            stage(name, mask.bit_count())
+            if not mask:
+                break
+
+        result = self.index.gather(mask)
+        stage("extraction", len(result))
+
+        if query.search and result:
+            result = self._search(students, result, query)
+            stage("recherche", len(result))
+
+        if result:
+            result = self.sort_ranks.sort(result, query.sort)
+            if query.search:
+                # Correspondances les plus proches d'abord (l'ordre du tri est conservé)
+                result = self.search.rank(result)
+            stage("tri", len(result))
+
+        self.last_timings = timings
+        return result
+
+    def _search(self, students, candidates, query):
+        if query.fuzzy:
+            return self.search.fuzzy_search(candidates, query.search)
+
+        # Le résultat précédent est réutilisé si la saisie a seulement été prolongée
+        context = (id(students),) + query.index_key()
+        version = (self.student_manager.version, self.event_manager.version)
+        return self.search.search(candidates, query.search, context, version)
+
+    def format_timings(self):
+        """Résumé lisible de last_timings (profilage)"""
+        return " | ".join(
+            f"{name}: {duration:.2f} ms ({count})"
+            for name, duration, count in self.last_timings
+        )
@@ -0,0 +1,128 @@
+from utils.text_utils import fold_text, edit_pattern, pattern_distance
+
+# Champs dont les mots sont indexés pour la recherche approchée
+FUZZY_FIELDS = ("nom", "prenom")
+
+
+def _words(student):
+    words = set()
+    for field in FUZZY_FIELDS:
+        words.update(fold_text(getattr(student, field)).replace("-", " ").split())
+    return words
+
+
+class _BKNode:
+    __slots__ = ("word", "children")
+
+    def __init__(self, word):
+        self.word = word
+        self.children = {}  # distance -> _BKNode
+
+
+class StudentFuzzyIndex:
+    """BK-tree des mots des noms et prénoms, pour la recherche avec fautes de frappe"""
+
+    def __init__(self, source):
+        self._source = source
+        self._root = None
+        self._students = None  # mot -> set de fiches (un mot sans fiche reste dans l'arbre)
+        self._words = None     # fiche -> mots indexés
+
+    def clear(self):
+        self._root = None
+        self._students = None
+        self._words = None
+
+    def _ensure_built(self):
+        if self._students is None:
+            self._students = {}
+            self._words = {}
+            for student in self._source():
+                self._add(student)
+
+    def add(self, student):
+        if self._students is not None:
+            self._add(student)
+
+    def remove(self, student):
+        if self._students is None:
+            return
+        for word in self._words.pop(student, ()):
+            bucket = self._students.get(word)
+            if bucket is not None:
+                bucket.discard(student)
+
+    def _add(self, student):
+        words = _words(student)
+        self._words[student] = words
+        for word in words:
+            bucket = self._students.get(word)
+            if bucket is None:
+                self._students[word] = {student}
+                self._insert(word)
+            else:
+                bucket.add(student)
+
+    def _insert(self, word):
+        if self._root is None:
+            self._root = _BKNode(word)
+            return
+        pattern = edit_pattern(word)
+        node = self._root
+        while True:
+            distance = pattern_distance(pattern, node.word)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(word)
+                return
+            node = child
+
+    def _near_words(self, word, max_distance):
+        """Mots de l'arbre à distance <= max_distance : {mot: distance}"""
+        found = {}
+        if self._root is None:
+            return found
+        pattern = edit_pattern(word)
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = pattern_distance(pattern, node.word)
+            if distance <= max_distance:
+                found[node.word] = distance
+            # Inégalité triangulaire : seuls ces sous-arbres peuvent contenir des candidats
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in node.children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        return found
+
+    def closest(self, query, max_distance=2, limit=50):
+        """[(distance, fiche)] par distance croissante ; distance = somme des meilleurs mots"""
+        self._ensure_built()
+        query_words = fold_text(query).replace("-", " ").split()
+        if not query_words:
+            return []
+
+        scores = None
+        for query_word in query_words:
+            best = {}
+            for word, distance in self._near_words(query_word, max_distance).items():
+                for student in self._students.get(word, ()):
+                    if distance < best.get(student, max_distance + 1):
+                        best[student] = distance
+            if scores is None:
+                scores = best
+            else:
+                scores = {
+                    student: score + best[student]
+                    for student, score in scores.items() if student in best
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1])
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(distance, student) for student, distance in ranked]
@@ -0,0 +1,85 @@
+class IncrementalSearch:
+    """
+    Recherche texte (nom, prénom, classe, email ; sans accents ni majuscules)
+    - les correspondances viennent de l'index de StudentDataManager (StudentSearchIndex)
+    - si la nouvelle saisie contient l'ancienne ("dub" -> "dubo"), seuls les élèves
+      du résultat précédent sont réexaminés
+    - sinon (effacement, autre texte, autres filtres, données modifiées) on repart
+      de la liste complète des candidats
+    Mode approché (fuzzy_search) : noms à quelques fautes de frappe près (BK-tree).
+    """
+
+    # Mode approché : distance d'édition maximale par mot et nombre de résultats
+    FUZZY_MAX_DISTANCE = 2
+    FUZZY_LIMIT = 50
+
+    def __init__(self, index, fuzzy_index=None):
+        self.index = index
+        self.fuzzy_index = fuzzy_index
+        self._context = None      # (version des données, autres filtres)
+        self._query = ""
+        self._result = None
+        self._distances = None    # fiche -> distance (dernière recherche approchée)
+
+    def search(self, candidates, query, context, version):
+        """
+        candidates : élèves retenus par les autres filtres
+        context : clé de ces filtres (le résultat précédent n'est réutilisé qu'à l'identique)
+        version : version des données
+        """
+        query = self.index.fold_query(query)
+        context = (version, context)
+        self._distances = None
+
+        if not query:
+            self._context, self._query, self._result = context, "", None
+            return candidates
+
+        source = candidates
+        if (
+            self._result is not None
+            and context == self._context
+            and self._query in query
+        ):
+            source = self._result
+
+        # Trigrammes : présélection ; vérification sur le texte replié de la fiche
+        possible = self.index.candidates(query)
+        matches = self.index.matches
+        result = [
+            s for s in source
+            if (possible is None or s in possible) and matches(s, query)
+        ]
+
+        self._context, self._query, self._result = context, query, result
+        return result
+
+    def fuzzy_search(self, candidates, query):
+        """Les FUZZY_LIMIT élèves de candidates les plus proches de query"""
+        allowed = set(candidates)
+        matches = [
+            (distance, student)
+            for distance, student in self.fuzzy_index.closest(
+                query, self.FUZZY_MAX_DISTANCE, limit=None
+            )
+            if student in allowed
+        ][:self.FUZZY_LIMIT]
+
+        # Le mode approché ne sert pas de base à un affinage incrémental
+        self._context, self._query, self._result = None, "", None
+        self._distances = {student: distance for distance, student in matches}
+        return [student for _, student in matches]
+
+    def rank(self, students):
+        """
+        Classe les résultats (tri stable, l'ordre choisi est conservé à égalité) :
+        - mode approché : par distance d'édition
+        - sinon : début de champ, puis début de mot, puis le reste
+        """
+        if self._distances is not None:
+            distances = self._distances
+            return sorted(students, key=lambda s: distances[s])
+        if not self._query:
+            return students
+        query, rank = self._query, self.index.rank
+        return sorted(students, key=lambda s: rank(s, query))
@@ -0,0 +1,101 @@
+from utils.text_utils import fold_text
+
+# Séparateur entre les champs indexés : une recherche ne peut pas chevaucher deux champs
+_SEPARATOR = "\x00"
+# Champs couverts par la recherche
+SEARCH_FIELDS = ("nom", "prenom", "classe", "email")
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class StudentSearchIndex:
+    """Index par trigrammes du texte replié des élèves, construit à la première recherche"""
+
+    def __init__(self, source):
+        self._source = source  # fonction retournant les fiches à indexer
+        self._texts = None     # fiche -> texte replié (champs séparés par _SEPARATOR)
+        self._postings = None  # trigramme -> set de fiches
+
+    def clear(self):
+        self._texts = None
+        self._postings = None
+
+    def _ensure_built(self):
+        if self._texts is None:
+            self._texts = {}
+            self._postings = {}
+            for student in self._source():
+                self._add(student)
+
+    def add(self, student):
+        if self._texts is not None:
+            self._add(student)
+
+    def remove(self, student):
+        if self._texts is not None:
+            self._remove(student)
+
+    def _add(self, student):
+        text = fold_text(_SEPARATOR + _SEPARATOR.join(
+            getattr(student, field) or "" for field in SEARCH_FIELDS
+        ))
+        self._texts[student] = text
+        postings = self._postings
+        for gram in _trigrams(text):
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = {student}
+            else:
+                bucket.add(student)
+
+    def _remove(self, student):
+        text = self._texts.pop(student, None)
+        if text is None:
+            return
+        postings = self._postings
+        for gram in _trigrams(text):
+            bucket = postings.get(gram)
+            if bucket is not None:
+                bucket.discard(student)
+                if not bucket:
+                    del postings[gram]
+
+    @staticmethod
+    def fold_query(query):
+        return fold_text(query.strip())
+
+    def candidates(self, folded_query):
+        """
+        Fiches pouvant correspondre (intersection des trigrammes de la requête),
+        ou None si la requête est trop courte pour utiliser l'index
+        """
+        self._ensure_built()
+        grams = _trigrams(folded_query)
+        if not grams:
+            return None
+        buckets = sorted(
+            (self._postings.get(gram, ()) for gram in grams), key=len
+        )
+        result = set(buckets[0])
+        for bucket in buckets[1:]:
+            if not result:
+                break
+            result &= bucket
+        return result
+
+    def matches(self, student, folded_query):
+        self._ensure_built()
+        text = self._texts.get(student)
+        return text is not None and folded_query in text
+
+    def rank(self, student, folded_query):
+        """0 : un champ commence par la requête, 1 : un mot commence par la requête, 2 : ailleurs"""
+        self._ensure_built()
+        text = self._texts.get(student, "")
+        if _SEPARATOR + folded_query in text:
+            return 0
+        if " " + folded_query in text or "-" + folded_query in text:
+            return 1
+        return 2
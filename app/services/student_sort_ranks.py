@@ -0,0 +1,97 @@
+NO_DATE = float("inf")  # élève sans événement daté : après toutes les dates
+
+
+def _name_key(student):
+    return (student.nom or "").lower()
+
+
+def _class_key(student):
+    return (student.annee or 0, student.classe or "")
+
+
+def _year_key(student):
+    return student.annee or 0
+
+
+class StudentSortRanks:
+    """
+    Rangs de tri précalculés pour chaque mode de tri de la liste des élèves
+    - rang dense par mode (élèves à égalité = même rang, le tri reste stable)
+    - calculés à la première demande du mode, puis gardés tant que les données dont
+      le mode dépend n'ont pas changé (élèves seulement, sauf "Date (Mois)")
+    Trier une sélection revient alors à ordonner des entiers.
+    """
+
+    # Mode -> (mode dont on réutilise les rangs, ordre inverse)
+    MODES = {
+        "Nom A-Z": ("Nom A-Z", False),
+        "Nom Z-A": ("Nom A-Z", True),
+        "Classe": ("Classe", False),
+        "Année": ("Année", False),
+        "Date (Mois)": ("Date (Mois)", False),
+    }
+
+    # Modes dont les rangs dépendent aussi des événements
+    EVENT_MODES = ("Date (Mois)",)
+
+    def __init__(self, student_manager, event_manager):
+        self.student_manager = student_manager
+        self.event_manager = event_manager
+        self._ranks = {}  # mode -> (version, {fiche: rang})
+
+    def _key_function(self, mode):
+        if mode == "Nom A-Z":
+            return _name_key
+        if mode == "Classe":
+            return _class_key
+        if mode == "Année":
+            return _year_key
+
+        # Date (Mois) : prochain événement daté (Event.date_ordinal)
+        em = self.event_manager
+
+        def next_event_date(student):
+            ordinals = [
+                event.date_ordinal
+                for event in map(em.get_event, em.get_student_events(student.id))
+                if event is not None and event.date_ordinal is not None
+            ]
+            return min(ordinals) if ordinals else NO_DATE
+
+        return next_event_date
+
+    def _ranks_for(self, mode):
+        version = self.student_manager.version
+        if mode in self.EVENT_MODES:
+            version = (version, self.event_manager.version)
+
+        version_ranks = self._ranks.get(mode)
+        if version_ranks is not None and version_ranks[0] == version:
+            return version_ranks[1]
+
+        key = self._key_function(mode)
+        keyed = sorted(
+            ((key(s), s) for s in self.student_manager.get_all_students()),
+            key=lambda item: item[0]
+        )
+        ranks = {}
+        rank, previous = -1, object()
+        for value, student in keyed:
+            if value != previous:
+                rank += 1
+                previous = value
+            ranks[student] = rank
+        self._ranks[mode] = (version, ranks)
+        return ranks
+
+    def sort(self, students, mode):
+        """Trie students selon mode (liste inchangée si le mode est inconnu)"""
+        if mode not in self.MODES:
+            return students
+        base_mode, reverse = self.MODES[mode]
+        ranks = self._ranks_for(base_mode)
+        try:
+            return sorted(students, key=ranks.__getitem__, reverse=reverse)
+        except KeyError:
+            # Fiche absente du gestionnaire (ancienne copie de la liste) : tri par clé
+            return sorted(students, key=self._key_function(base_mode), reverse=reverse)
@@ -1,40 +1,233 @@
+from tkinter import ttk
+
 class StudentTreeviewRenderer:
-    def __init__(self, treeview, styles):
+    """
+    Affichage virtualisé de la liste des élèves dans un Treeview
+    - seules les lignes visibles (+ OVERSCAN) existent dans le Treeview
+    - les items forment un pool recyclé (row_<n>) : la ligne d'un élève qui sort de la
+      fenêtre est réaffectée à celui qui entre (item + move), sans delete ni insert
+    - chaque rafraîchissement est un diff par élève avec les lignes déjà affichées :
+      un élève toujours visible garde son item, seules les lignes modifiées touchent Tk
+    - la barre de défilement représente la liste complète (nombre logique de lignes)
+    - les lignes sont construites à la demande par row_factory(élève)
+    """
+
+    # Lignes matérialisées en plus de la zone visible
+    OVERSCAN = 5
+    # Hauteur de ligne utilisée si le thème ne la fournit pas
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, treeview, styles, row_factory, scrollbar=None):
         self.treeview = treeview
         self.styles = styles
+        self.row_factory = row_factory
+        self.scrollbar = scrollbar
+
+        self.students = []
+        self.selected_ids = ()
+        self.first = 0            # index logique de la première ligne affichée
+        self._order = []          # iid affichés, dans l'ordre du Treeview
+        self._rows = {}           # iid -> (valeurs, tags) tels qu'affichés
+        self._item_ids = {}       # iid -> id de l'élève affiché
+        self._iid_by_id = {}      # id de l'élève affiché -> iid
+        self._next_slot = 0       # numéro du prochain item créé
+        self.last_operations = 0  # lignes touchées au dernier rafraîchissement (diagnostic)
+
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        treeview.bind("<Configure>", lambda e: self._refresh_window(), add="+")
+        treeview.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        treeview.bind("<Button-4>", lambda e: self._on_wheel_step(-3), add="+")
+        treeview.bind("<Button-5>", lambda e: self._on_wheel_step(3), add="+")
+
+    # ===== Données =====
+    def render(self, students, selected_ids):
+        """Affiche students (liste complète filtrée) ; seule la fenêtre visible est créée"""
+        self.students = students
+        self.selected_ids = selected_ids
+        self._refresh_window()
 
     def clear(self):
-        self.treeview.delete(*self.treeview.get_children())
+        self.render([], ())
+
+    def update_selection(self, selected_ids, changed_ids):
+        """
+        Sélection modifiée (changed_ids) sans reconstruire les lignes :
+        seules la case et le tag des lignes affichées concernées sont mis à jour
+        """
+        self.selected_ids = selected_ids
+        self.last_operations = 0
+        for position, iid in enumerate(self._order):
+            student_id = self._item_ids[iid]
+            if student_id is None or student_id not in changed_ids:
+                continue
+            selected = student_id in selected_ids
+            values, tags = self._rows[iid]
+            values = ("☑️" if selected else "☐",) + values[1:]
+            tags = (self._row_tag(self.first + position, selected),)
+            if (values, tags) != self._rows[iid]:
+                self.treeview.item(iid, values=values, tags=tags)
+                self._rows[iid] = (values, tags)
+                self.last_operations += 1
 
-    def render(self, rows, selected_ids):
-        self.clear()
+    def student_id_at(self, iid):
+        """ID de l'élève affiché par l'item iid (None pour une ligne vide)"""
+        return self._item_ids.get(iid)
 
-        if not rows:
-            self.treeview.insert(
-                "", "end",
-                values=("", "Aucun élève trouvé", "", "", "", "")
-            )
+    # ===== Défilement =====
+    def visible_rows(self):
+        height = self.treeview.winfo_height()
+        row_height = self._row_height()
+        # Une ligne d'en-tête au-dessus des données
+        return max(1, height // row_height - 1)
+
+    def _row_height(self):
+        try:
+            value = ttk.Style(self.treeview).lookup("Treeview", "rowheight")
+            return int(value) if value else self.DEFAULT_ROW_HEIGHT
+        except Exception:
+            return self.DEFAULT_ROW_HEIGHT
+
+    def _max_first(self):
+        return max(0, len(self.students) - self.visible_rows())
+
+    def scroll_to(self, first):
+        first = min(max(0, int(first)), self._max_first())
+        if first != self.first:
+            self.first = first
+            self._refresh_window()
+
+    def scroll(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def yview(self, *args):
+        """Commande de la barre de défilement (moveto / scroll units|pages)"""
+        if not args:
             return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.students))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                amount *= self.visible_rows()
+            self.scroll(amount)
+
+    def _on_mousewheel(self, event):
+        return self._on_wheel_step(-3 if event.delta > 0 else 3)
 
-        for index, row in enumerate(rows):
-            tag = "even" if index % 2 == 0 else "odd"
-            if row["id"] in selected_ids:
-                tag = "selected"
-
-            self.treeview.insert(
-                "",
-                "end",
-                iid=f"student_{row['id']}",
-                values=(
-                    "☑️" if row["id"] in selected_ids else "☐",
+    def _on_wheel_step(self, rows):
+        # Le défilement natif du Treeview ne doit pas décaler la fenêtre matérialisée
+        self.scroll(rows)
+        return "break"
+
+    # ===== Matérialisation =====
+    def _window_rows(self):
+        """(id élève, valeurs, tags) de chaque ligne de la fenêtre courante"""
+        if not self.students:
+            return [(None, ("", "Aucun élève trouvé", "", "", "", ""), ())]
+
+        self.first = min(self.first, self._max_first())
+        last = min(len(self.students), self.first + self.visible_rows() + self.OVERSCAN)
+        selected_ids = self.selected_ids
+
+        window = []
+        for index in range(self.first, last):
+            row = self.row_factory(self.students[index])
+            student_id = row["id"]
+            selected = student_id in selected_ids
+            window.append((
+                student_id,
+                (
+                    "☑️" if selected else "☐",
                     row["nom"],
                     row["prenom"],
                     row["classe"],
                     row["annee"],
                     row["events"]
                 ),
-                tags=(tag,)
-            )
+                (self._row_tag(index, selected),)
+            ))
+        return window
+
+    @staticmethod
+    def _row_tag(index, selected):
+        return "selected" if selected else ("even" if index % 2 == 0 else "odd")
+
+    def _refresh_window(self):
+        """
+        Diff par élève entre les lignes affichées et la nouvelle fenêtre :
+        - élève encore visible : même item, move / item() seulement si nécessaire
+        - élève entrant : item libéré par un élève sortant (insert si le pool est vide)
+        - items en surplus (fenêtre plus petite) : delete
+        """
+        tree = self.treeview
+        window = self._window_rows()
+        wanted = {student_id for student_id, _, _ in window}
+        self.last_operations = 0
+
+        # Items libérés regroupés en fin de liste : les lignes conservées restent
+        # contiguës et n'ont pas à être déplacées
+        item_ids = self._item_ids
+        tail = len(self._order)
+        while tail and item_ids[self._order[tail - 1]] not in wanted:
+            tail -= 1
+        kept = [iid for iid in self._order[:tail] if item_ids[iid] in wanted]
+        moved = [iid for iid in self._order[:tail] if item_ids[iid] not in wanted]
+        for iid in moved:
+            tree.move(iid, "", "end")
+            self.last_operations += 1
+        free = self._order[tail:] + moved
+        for iid in free:
+            del self._iid_by_id[item_ids[iid]]
+        order = self._order = kept + free
+        free.reverse()  # réutilisation dans l'ordre d'affichage
+
+        for position, (student_id, values, tags) in enumerate(window):
+            iid = self._iid_by_id.get(student_id)
+            if iid is None and free:
+                iid = free.pop()
+            if iid is None:
+                iid = f"row_{self._next_slot}"
+                self._next_slot += 1
+                tree.insert("", position, iid=iid, values=values, tags=tags)
+                order.insert(position, iid)
+                self.last_operations += 1
+            else:
+                if order[position] != iid:
+                    tree.move(iid, "", position)
+                    order.remove(iid)
+                    order.insert(position, iid)
+                    self.last_operations += 1
+                if self._rows[iid] != (values, tags):
+                    tree.item(iid, values=values, tags=tags)
+                    self.last_operations += 1
+            self._rows[iid] = (values, tags)
+            self._item_ids[iid] = student_id
+            self._iid_by_id[student_id] = iid
+
+        if free:
+            # Items non réutilisés : tous placés après la fenêtre
+            tree.delete(*free)
+            self.last_operations += len(free)
+            for iid in free:
+                del self._rows[iid]
+                del self._item_ids[iid]
+            del order[len(window):]
+
+        tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        total = len(self.students)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(
+            self.first / total,
+            min(1.0, (self.first + self.visible_rows()) / total)
+        )
 
     def configure_tags(self):
         self.treeview.tag_configure(
@@ -50,4 +243,3 @@ class StudentTreeviewRenderer:
             "odd",
             background=self.styles.colors["off_white"]
         )
-# ====================================================
\ No newline at end of file
@@ -17,3 +17,19 @@ def parse_event_date(date_str):
             pass
 
     return None
+
+
+def month_key(d):
+    """Clé mois entière YYYYMM d'une date (202411)"""
+    return d.year * 100 + d.month
+
+
+MONTH_NAMES = (
+    "janvier", "février", "mars", "avril", "mai", "juin",
+    "juillet", "août", "septembre", "octobre", "novembre", "décembre"
+)
+
+
+def month_label(key):
+    """Libellé affiché d'une clé mois (202411 -> "novembre 2024"), indépendant de la locale"""
+    return f"{MONTH_NAMES[key % 100 - 1]} {key // 100}"
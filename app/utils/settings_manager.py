@@ -7,7 +7,11 @@ class SettingsManager:
     DEFAULT_SETTINGS = {
         "data_path": "",
         "font": "Arial",
-        "auto_update": True
+        "auto_update": True,
+        "student_storage": "json",  # "json" ou "sqlite"
+        "snapshot_cache": True,     # cache binaire à côté des fichiers JSON
+        "tombstone_retention_days": 30,  # délai avant purge des élèves supprimés
+        "search_delay_ms": 120  # pause de frappe avant de lancer la recherche
     }
 
     def __init__(self):
@@ -42,6 +46,18 @@ class SettingsManager:
     def is_auto_update_enabled(self):
         return self.settings["auto_update"]
 
+    def get_student_storage(self):
+        return self.settings["student_storage"]
+
+    def is_snapshot_cache_enabled(self):
+        return self.settings["snapshot_cache"]
+
+    def get_tombstone_retention_days(self):
+        return self.settings["tombstone_retention_days"]
+
+    def get_search_delay_ms(self):
+        return self.settings["search_delay_ms"]
+
     # ===== Setters =====
     def set_data_path(self, path):
         self.settings["data_path"] = path
@@ -0,0 +1,52 @@
+import re
+import unicodedata
+
+# Diacritiques combinants (accents, cédille, tréma...) après décomposition NFKD
+_COMBINING_MARKS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+
+
+def fold_text(text):
+    """Texte sans accents ni majuscules, pour les comparaisons ("Léa" -> "lea")"""
+    if not text:
+        return ""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text)).casefold()
+
+
+def edit_pattern(text):
+    """Prépare text pour plusieurs calculs de distance (voir pattern_distance)"""
+    masks = {}
+    for i, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks, len(text)
+
+
+def pattern_distance(pattern, text):
+    """
+    Distance de Levenshtein entre le texte d'un edit_pattern et text.
+    Algorithme bit-parallèle de Myers / Hyyrö : une ligne de la matrice par caractère,
+    calculée avec des opérations sur entiers (bien plus rapide qu'une boucle par case).
+    """
+    masks, m = pattern
+    if m == 0:
+        return len(text)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn, score = full, 0, m
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | vn
+        xh = ((((eq & vp) + vp) & full) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+    return score
@@ -51,15 +51,16 @@ class HomeView:
             # Convertir au format attendu par la vue
             formatted_events = {}
             for event in events_list:
-                if isinstance(event, dict) and 'date' in event and 'nom' in event:
+                # Date analysée au chargement (Event.date_value), tous formats acceptés
+                event_date = event.date_value
+                if event_date and 'nom' in event:
                     try:
-                        event_date = datetime.strptime(event['date'], '%Y-%m-%d')
                         current_date = datetime.now()
                         
                         # Déterminer le statut
-                        if event_date.date() < current_date.date():
+                        if event_date < current_date.date():
                             status = "passé"
-                        elif event_date.date() == current_date.date():
+                        elif event_date == current_date.date():
                             status = "aujourd'hui"
                         else:
                             status = "à venir"
@@ -82,7 +83,8 @@ class HomeView:
                             else:
                                 classes_set = {"Toutes classes"}
                         
-                        formatted_events[event['date']] = {
+                        formatted_events[event_date.isoformat()] = {
+                            "date": event_date,
                             "name": event['nom'],
                             "classes": list(classes_set),
                             "status": status,
@@ -233,7 +235,7 @@ class HomeView:
         # Filtrer les événements du mois courant
         monthly_events = []
         for date_str, event in events_data.items():
-            event_date = datetime.strptime(date_str, "%Y-%m-%d")
+            event_date = event["date"]
             if event_date.month == current_month and event_date.year == current_year:
                 monthly_events.append((date_str, event))
         
@@ -267,7 +269,7 @@ class HomeView:
             
             # Ajouter les événements
             for date_str, event in monthly_events:
-                event_date = datetime.strptime(date_str, "%Y-%m-%d")
+                event_date = event["date"]
                 
                 # Frame pour chaque événement
                 event_frame = self.styles.create_card_frame(scrollable_frame, padding="8")
@@ -613,4 +615,4 @@ class HomeView:
     def hide(self):
         """Cache la vue"""
         if self.frame:
-            self.frame.pack_forget()
\ No newline at end of file
+            self.frame.pack_forget()
@@ -3,6 +3,8 @@ from tkinter import ttk, messagebox
 
 from controller.StudentViewController import StudentViewController
 from ui.student_treeview_renderer import StudentTreeviewRenderer
+from utils.date_utils import month_label
+from utils.settings_manager import SettingsManager
 
 
 class StudentView:
@@ -16,6 +18,11 @@ class StudentView:
 
         # Variables UI
         self.search_var = tk.StringVar()
+        self.fuzzy_var = tk.BooleanVar(value=False)
+
+        # Recherche différée : on attend une pause de frappe avant de filtrer
+        self.search_delay_ms = SettingsManager().get_search_delay_ms()
+        self._search_after_id = None
 
         self.search_entry = None
         self.year_combo = None
@@ -23,6 +30,7 @@ class StudentView:
         self.event_category_combo = None
         self.event_combo = None
         self.month_combo = None
+        self._month_keys = {}  # libellé du combo -> clé YYYYMM
         self.sort_combo = None
 
         self.treeview = None
@@ -68,8 +76,9 @@ class StudentView:
             "class": self.class_combo.get(),
             "event_category": self.event_category_combo.get(),
             "event": self.event_combo.get(),
-            "month": self.month_combo.get(),
+            "month": self._month_keys.get(self.month_combo.get()),
             "search": self.search_var.get().strip(),
+            "fuzzy": self.fuzzy_var.get(),
             "sort": self.sort_combo.get(),
         }
 
@@ -91,7 +100,11 @@ class StudentView:
             self.year_combo["values"] = ["Toutes"] + self.controller.get_available_years()
             self.class_combo["values"] = ["Toutes"] + self.controller.get_available_classes()
             self.event_category_combo["values"] = ["Toutes"] + self.controller.get_event_categories()
-            self.month_combo["values"] = ["Tous"] + self.controller.get_available_months()
+            # Filtre sur la clé YYYYMM ; les libellés ne servent qu'à l'affichage
+            self._month_keys = {
+                month_label(key): key for key in self.controller.get_available_months()
+            }
+            self.month_combo["values"] = ["Tous"] + list(self._month_keys)
 
             self._update_event_filter()
 
@@ -131,6 +144,18 @@ class StudentView:
             command=self._on_calculate_cost
         ).pack(side="right")
 
+        ttk.Button(
+            bar,
+            text="Tout désélectionner",
+            command=self.controller.clear_selection
+        ).pack(side="left", padx=(12, 4))
+
+        ttk.Button(
+            bar,
+            text="Tout sélectionner",
+            command=self.controller.select_all_filtered
+        ).pack(side="left")
+
     def _on_import_excel(self):
         self.controller.import_excel_students()
         self.root.after(200, self._update_filters)
@@ -151,6 +176,13 @@ class StudentView:
         self.search_entry = ttk.Entry(row1, textvariable=self.search_var, width=20)
         self.search_entry.pack(side="left", padx=6)
 
+        ttk.Checkbutton(
+            row1,
+            text="Approximative",
+            variable=self.fuzzy_var,
+            command=self._apply_filters_now
+        ).pack(side="left")
+
         self.sort_combo = ttk.Combobox(
             row1,
             values=["Nom A-Z", "Nom Z-A", "Classe", "Année", "Date (Mois)"],
@@ -187,7 +219,7 @@ class StudentView:
         self._setup_bindings()
 
     def _setup_bindings(self):
-        self.search_var.trace_add("write", lambda *_: self.controller.apply_all_filters())
+        self.search_var.trace_add("write", lambda *_: self._on_search_changed())
 
         for combo in (
             self.year_combo,
@@ -196,21 +228,40 @@ class StudentView:
             self.month_combo,
             self.sort_combo,
         ):
-            combo.bind("<<ComboboxSelected>>", lambda e: self.controller.apply_all_filters())
+            combo.bind("<<ComboboxSelected>>", lambda e: self._apply_filters_now())
 
         self.event_category_combo.bind(
             "<<ComboboxSelected>>",
             lambda e: self._on_category_changed()
         )
 
+    def _on_search_changed(self):
+        # Chaque frappe annule la recherche en attente : seule la dernière est exécutée
+        self._cancel_pending_search()
+        self._search_after_id = self.root.after(self.search_delay_ms, self._run_pending_search)
+
+    def _run_pending_search(self):
+        self._search_after_id = None
+        self.controller.apply_all_filters()
+
+    def _cancel_pending_search(self):
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
+
+    def _apply_filters_now(self):
+        """Filtrage immédiat (combos) ; la recherche en attente est incluse"""
+        self._cancel_pending_search()
+        self.controller.apply_all_filters()
+
     def _on_category_changed(self):
         self._update_event_filter()
-        self.controller.apply_all_filters()
+        self._apply_filters_now()
 
     def _on_reset_filters(self):
         self._initialize_default_filters()
         self._update_filters()
-        self.controller.apply_all_filters()
+        self._apply_filters_now()
 
     # =========================================================
     # TABLE
@@ -235,39 +286,55 @@ class StudentView:
         self.treeview.column("classe", width=70, anchor="center", stretch=False)
         self.treeview.column("annee", width=70, anchor="center", stretch=False)
 
-        self.treeview.pack(fill="both", expand=True)
+        # Défilement virtuel : la barre de défilement est pilotée par le renderer
+        scrollbar = ttk.Scrollbar(frame, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+        self.treeview.pack(side="left", fill="both", expand=True)
 
-        self.tree_renderer = StudentTreeviewRenderer(self.treeview, self.styles)
+        self.tree_renderer = StudentTreeviewRenderer(
+            self.treeview, self.styles, self._make_row, scrollbar
+        )
         self.tree_renderer.configure_tags()
 
         self.treeview.bind("<Button-1>", self._on_tree_click)
         self.treeview.bind("<Double-1>", self._on_tree_double_click)
 
+    def _make_row(self, student):
+        """Ligne du tableau, construite seulement pour les élèves affichés à l'écran"""
+        return {
+            "id": student["id"],
+            "nom": student.get("nom", ""),
+            "prenom": student.get("prenom", ""),
+            "classe": student.get("classe", ""),
+            "annee": student.get("annee", ""),
+            "events": " • ".join(self.controller.get_student_events(student)) or "Aucun"
+        }
+
     def update_display(self):
-        rows = []
-        for student in self.controller.filtered_students:
-            rows.append({
-                "id": student["id"],
-                "nom": student.get("nom", ""),
-                "prenom": student.get("prenom", ""),
-                "classe": student.get("classe", ""),
-                "annee": student.get("annee", ""),
-                "events": " • ".join(self.controller.get_student_events(student)) or "Aucun"
-            })
-
-        self.tree_renderer.render(rows, self.controller.selected_students)
+        self.tree_renderer.render(
+            self.controller.filtered_students, self.controller.selected_students
+        )
+        self._update_status_bar()
+
+    def update_selection(self, changed_ids):
+        """Sélection modifiée : cases des lignes concernées et compteur seulement"""
+        self.tree_renderer.update_selection(self.controller.selected_students, changed_ids)
         self._update_status_bar()
 
     def _on_tree_click(self, event):
         item = self.treeview.identify_row(event.y)
         col = self.treeview.identify_column(event.x)
-        if item and col == "#1":
-            self.controller.toggle_student_selection(int(item.replace("student_", "")))
+        student_id = self.tree_renderer.student_id_at(item) if item else None
+        if student_id is not None and col == "#1":
+            # Maj+clic : sélection de la plage depuis le dernier élève cliqué
+            extend = bool(event.state & 0x0001)
+            self.controller.toggle_student_selection(student_id, extend=extend)
 
     def _on_tree_double_click(self, event):
         item = self.treeview.identify_row(event.y)
-        if item:
-            self.controller.open_student_details(int(item.replace("student_", "")))
+        student_id = self.tree_renderer.student_id_at(item) if item else None
+        if student_id is not None:
+            self.controller.open_student_details(student_id)
 
     # =========================================================
     # STATUS BAR
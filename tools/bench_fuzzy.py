@@ -0,0 +1,114 @@
+"""
+Banc d'essai de la recherche approchée (StudentFuzzyIndex)
+
+Compare StudentFuzzyIndex.closest() à un parcours complet des élèves avec une
+distance de Levenshtein classique (programmation dynamique) : mêmes résultats
+attendus, durées affichées pour les deux.
+
+    python tools/bench_fuzzy.py [nombre d'élèves] [nombre de requêtes]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from model.student import Student  # noqa: E402
+from services.student_fuzzy_index import StudentFuzzyIndex, FUZZY_FIELDS  # noqa: E402
+from utils.text_utils import fold_text  # noqa: E402
+
+MAX_DISTANCE = 2
+SYLLABLES = ["ba", "ber", "cha", "du", "fon", "gal", "jean", "la", "lé", "ma", "mar",
+             "mo", "nel", "pont", "ri", "ro", "sa", "tin", "val", "zé"]
+
+
+def dp_levenshtein(a, b):
+    """Distance de Levenshtein, une case de la matrice à la fois"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def words(text):
+    return fold_text(text).replace("-", " ").split()
+
+
+def brute_force(students, query):
+    """{fiche: distance} en comparant chaque mot de la requête à chaque mot de chaque fiche"""
+    result = {}
+    query_words = words(query)
+    for student in students:
+        student_words = set()
+        for field in FUZZY_FIELDS:
+            student_words.update(words(getattr(student, field)))
+        total = 0
+        for query_word in query_words:
+            best = min((dp_levenshtein(query_word, w) for w in student_words), default=None)
+            if best is None or best > MAX_DISTANCE:
+                break
+            total += best
+        else:
+            result[student] = total
+    return result
+
+
+def make_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def typo(rng, word):
+    position = rng.randrange(len(word))
+    return word[:position] + rng.choice("aeiourst") + word[position + 1:]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(42)
+
+    students = [
+        Student({"id": i, "nom": make_name(rng), "prenom": make_name(rng)})
+        for i in range(1, count + 1)
+    ]
+    queries = [typo(rng, rng.choice(students).nom) for _ in range(query_count)]
+
+    index = StudentFuzzyIndex(lambda: students)
+    start = time.perf_counter()
+    index.closest("x", MAX_DISTANCE)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    index_ms = scan_ms = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        found = dict(
+            (student, distance)
+            for distance, student in index.closest(query, MAX_DISTANCE, limit=None)
+        )
+        index_ms += (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        expected = brute_force(students, query)
+        scan_ms += (time.perf_counter() - start) * 1000
+
+        if found != expected:
+            print(f"ÉCHEC pour {query!r}: index {len(found)} fiches, parcours {len(expected)}")
+            return 1
+
+    print(f"{count} élèves, {query_count} requêtes : résultats identiques")
+    print(f"construction de l'index : {build_ms:.1f} ms")
+    print(f"index (BK-tree)         : {index_ms / query_count:.2f} ms / requête")
+    print(f"parcours complet (DP)   : {scan_ms / query_count:.2f} ms / requête")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())